@@ -0,0 +1,41 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .utils import bump_user_table_version
+
+_state = threading.local()
+
+
+@contextmanager
+def suspended():
+    """
+    Stops user writes in this thread from bumping the user table version
+    one by one; bulk maintenance bumps it once afterwards.
+    """
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = False
+
+
+def active():
+    return not getattr(_state, "suspended", False)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached data depends on
+    if not active() or (update_fields and set(update_fields) == {"last_login"}):
+        return
+    bump_user_table_version()
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, **kwargs):
+    if active():
+        bump_user_table_version()
@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+USER_TABLE_VERSION_KEY = "accounts:user-table-version"
+
+# Backends whose entries only the current process sees
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+# On a process-local cache another worker's user changes never bump this
+# process's version, so the version and the data keyed on it only live
+# this long (seconds)
+LOCAL_USER_DATA_TIMEOUT = 30
+
+
+def cache_is_shared():
+    """
+    True when every worker process sees the same default cache: it is not
+    process-local, or DASHBOARD_CACHE_SINGLE_PROCESS says only one worker
+    runs.
+    """
+    if getattr(settings, "DASHBOARD_CACHE_SINGLE_PROCESS", False):
+        return True
+    return not isinstance(caches["default"], PROCESS_LOCAL_BACKENDS)
+
+
+def user_data_timeout():
+    """Cache timeout for data keyed on user_table_version()."""
+    return DEFAULT_TIMEOUT if cache_is_shared() else LOCAL_USER_DATA_TIMEOUT
+
+
+def _version_timeout():
+    return None if cache_is_shared() else LOCAL_USER_DATA_TIMEOUT
+
+
+def _fresh_version():
+    # Time based, so a restarted sequence never reuses an old version
+    return time.time_ns()
+
+
+def user_table_version():
+    """
+    Returns a counter that changes whenever a user is saved or deleted.
+    Cached data derived from the user table is keyed on it.
+    """
+    version = cache.get(USER_TABLE_VERSION_KEY)
+    if version is None:
+        cache.add(USER_TABLE_VERSION_KEY, _fresh_version(), timeout=_version_timeout())
+        version = cache.get(USER_TABLE_VERSION_KEY)
+    return version
+
+
+def bump_user_table_version():
+    try:
+        cache.incr(USER_TABLE_VERSION_KEY)
+    except ValueError:
+        cache.set(USER_TABLE_VERSION_KEY, _fresh_version(), timeout=_version_timeout())
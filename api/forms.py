@@ -0,0 +1,33 @@
+from django import forms
+
+from plans.forms import DashboardFilterForm
+from reports.models import Report
+
+
+class PlanFilterForm(DashboardFilterForm):
+    """
+    The dashboard's plan filters plus the owner's department. Unlike the
+    dashboard, the API rejects invalid filters instead of dropping them.
+    """
+    department = forms.IntegerField(required=False, min_value=1)
+
+    LOOKUPS = {"department": "user__department_id"}
+
+    def filter(self, queryset):
+        lookups = {
+            self.LOOKUPS.get(name, name): value for name, value in self.cleaned_data.items()
+            if value not in (None, '')
+        }
+        return queryset.filter(**lookups)
+
+
+class ReportFilterForm(PlanFilterForm):
+    """Reports filter on their own status and on their plan's year, type and level."""
+    status = forms.ChoiceField(choices=[('', 'All Statuses')] + Report.STATUS_CHOICES, required=False)
+
+    LOOKUPS = {
+        "year": "plan__year",
+        "plan_type": "plan__plan_type",
+        "level": "plan__level",
+        "department": "user__department_id",
+    }
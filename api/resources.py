@@ -0,0 +1,128 @@
+"""
+values() projections behind the JSON API.
+
+A resource lists the fields a client may ask for with ``fields=`` (output
+name: lookup) and the related lists it may add with ``include=``. Rows
+are the dicts values() returns, never model instances, and each include
+costs one more query per page however many rows the page has.
+"""
+from collections import defaultdict, namedtuple
+
+from django.db.models import F
+
+from plans.models import KPI, DetailActivity, MajorActivity, Plan, StrategicGoal
+from reports.models import KPIReport, MajorActivityReport, Report
+
+# ``parent`` is the lookup of the owning row's id; ``within`` names the
+# include whose rows this one nests in (None: the resource's own rows)
+Include = namedtuple("Include", ["model", "parent", "fields", "within"])
+
+
+def project(queryset, fields):
+    """values() for {output name: lookup}; renamed lookups go through F()."""
+    return queryset.values(
+        *[name for name, lookup in fields.items() if name == lookup],
+        **{name: F(lookup) for name, lookup in fields.items() if name != lookup},
+    )
+
+
+class Resource:
+    def __init__(self, model, fields, default_fields, includes, order_field):
+        self.model = model
+        self.fields = fields
+        self.default_fields = default_fields
+        self.includes = includes
+        self.order_field = order_field
+
+    def rows(self, queryset, names):
+        """
+        values() rows with the requested fields, plus the id and ordering
+        field that keyset pagination needs; strip() drops those again.
+        """
+        keys = dict.fromkeys(["id", self.order_field, *names])
+        return project(queryset, {name: self.fields[name] for name in keys})
+
+    def strip(self, rows, names):
+        extra = {"id", self.order_field} - set(names)
+        for row in rows:
+            for name in extra:
+                del row[name]
+        return rows
+
+    def attach(self, rows, names):
+        """Adds each requested include to ``rows`` in place."""
+        containers = {None: rows}
+        for name, include in self.includes.items():
+            if name not in names:
+                continue
+            owners = containers[include.within]
+            grouped = defaultdict(list)
+            queryset = include.model.objects.filter(**{
+                f"{include.parent}__in": [owner["id"] for owner in owners]
+            }).order_by("id")
+            for child in project(queryset, {"_parent": include.parent, **include.fields}):
+                grouped[child.pop("_parent")].append(child)
+            children = []
+            for owner in owners:
+                owner[name] = grouped.get(owner["id"], [])
+                children.extend(owner[name])
+            containers[name] = children
+        return rows
+
+
+def _fields(*names, **renamed):
+    return {**{name: name for name in names}, **renamed}
+
+
+PLANS = Resource(
+    Plan,
+    fields=_fields(
+        "id", "level", "plan_type", "year", "quarter_number", "month", "week_number",
+        "pillar", "status", "current_reviewer_role", "review_comments", "created_at", "modified_at",
+        owner="user__username",
+        department="user__department_id",
+        department_name="user__department__name",
+    ),
+    default_fields=[
+        "id", "owner", "department", "level", "plan_type", "year",
+        "quarter_number", "month", "week_number", "status", "modified_at",
+    ],
+    includes={
+        "goals": Include(StrategicGoal, "plan_id", _fields("id", "title"), None),
+        "kpis": Include(KPI, "plan_id", _fields(
+            "id", "name", "measurement", "baseline", "target",
+            "target_q1", "target_q2", "target_q3", "target_q4",
+        ), None),
+        "activities": Include(MajorActivity, "plan_id", _fields(
+            "id", "weight", "budget", name="major_activity", responsible="responsible_person__username",
+        ), None),
+        # Nested in each activity; asking for them brings the activities too
+        "details": Include(DetailActivity, "major_activity_id", _fields(
+            "id", "weight", "status", name="detail_activity", responsible="responsible_person__username",
+        ), "activities"),
+    },
+    order_field="created_at",
+)
+
+REPORTS = Resource(
+    Report,
+    fields=_fields(
+        "id", "plan", "reporting_period", "status", "submission_date",
+        "overall_comment", "reviewer_comment", "modified_at",
+        owner="user__username",
+        department="user__department_id",
+        year="plan__year",
+        level="plan__level",
+    ),
+    default_fields=["id", "plan", "owner", "reporting_period", "status", "submission_date", "modified_at"],
+    includes={
+        "kpis": Include(KPIReport, "report_id", _fields(
+            "id", "kpi", "actual_value", "achievement_percent", "remark", kpi_name="kpi__name",
+        ), None),
+        "activities": Include(MajorActivityReport, "report_id", _fields(
+            "id", "major_activity", "progress", "actual_budget_used", "challenge", "mitigation",
+            activity_name="major_activity__major_activity",
+        ), None),
+    },
+    order_field="modified_at",
+)
@@ -0,0 +1,104 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from plans.models import KPI, DetailActivity, Department, MajorActivity, Plan, StrategicGoal
+from reports.models import Report
+
+
+class ApiTestData:
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Marketing", pillar="corporate")
+        cls.owner = User.objects.create_user("owner", role="individual", department=cls.department)
+        cls.other = User.objects.create_user("other", role="individual")
+        cls.plans = []
+        for year in (2023, 2024, 2025):
+            plan = Plan.objects.create(user=cls.owner, level="individual", plan_type="yearly", year=year)
+            StrategicGoal.objects.create(plan=plan, title=f"Goal {year}")
+            KPI.objects.create(plan=plan, name="Visitors", baseline=0, target=100)
+            activity = MajorActivity.objects.create(plan=plan, major_activity="Campaign", weight=5, budget=500)
+            DetailActivity.objects.create(major_activity=activity, detail_activity="Print flyers", weight=5)
+            cls.plans.append(plan)
+        cls.report = Report.objects.create(plan=cls.plans[0], user=cls.owner, reporting_period="yearly")
+        cls.hidden = Plan.objects.create(user=cls.other, level="individual", plan_type="yearly", year=2025)
+
+    def get(self, name, *args, **params):
+        return self.client.get(reverse(name, args=args), params)
+
+
+class PlanApiTests(ApiTestData, TestCase):
+    def test_requires_login(self):
+        response = self.get("api_plan_list")
+        self.assertEqual(response.status_code, 401)
+
+    def test_lists_only_visible_plans(self):
+        self.client.force_login(self.owner)
+        results = self.get("api_plan_list").json()["results"]
+        self.assertEqual({row["id"] for row in results}, {plan.pk for plan in self.plans})
+        self.assertEqual(results[0]["owner"], "owner")
+
+        self.assertEqual(self.get("api_plan_detail", self.hidden.pk).status_code, 404)
+
+    def test_sparse_fields_and_includes(self):
+        self.client.force_login(self.owner)
+        plan = self.plans[0]
+        body = self.get("api_plan_detail", plan.pk, fields="year", include="goals,details").json()
+        self.assertEqual(set(body), {"year", "goals", "activities"})
+        self.assertEqual(body["goals"], [{"id": plan.goals.get().pk, "title": "Goal 2023"}])
+        self.assertEqual(body["activities"][0]["details"][0]["name"], "Print flyers")
+
+    def test_includes_cost_one_query_each(self):
+        self.client.force_login(self.owner)
+        self.get("api_plan_list")  # session and user lookups
+        with self.assertNumQueries(6):
+            # session, user, plans, goals, activities, details
+            response = self.get("api_plan_list", include="goals,activities,details")
+        self.assertEqual(len(response.json()["results"]), 3)
+
+    def test_keyset_pagination(self):
+        self.client.force_login(self.owner)
+        body = self.get("api_plan_list", limit=2, fields="year").json()
+        self.assertEqual([row["year"] for row in body["results"]], [2025, 2024])
+        body = self.get("api_plan_list", limit=2, fields="year", cursor=body["next_cursor"]).json()
+        self.assertEqual([row["year"] for row in body["results"]], [2023])
+        self.assertIsNone(body["next"])
+
+    def test_filters(self):
+        self.client.force_login(self.owner)
+        results = self.get("api_plan_list", year=2024, department=self.department.pk).json()["results"]
+        self.assertEqual([row["id"] for row in results], [self.plans[1].pk])
+
+    def test_rejects_unknown_fields_and_bad_filters(self):
+        self.client.force_login(self.owner)
+        response = self.get("api_plan_list", fields="year,password", status="LOST")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"]["fields"], ["Unknown field: password"])
+        self.assertEqual(self.get("api_plan_list", limit=1000).status_code, 400)
+
+
+class ReportApiTests(ApiTestData, TestCase):
+    def test_drafts_stay_private(self):
+        self.client.force_login(self.owner)
+        results = self.get("api_report_list", include="activities").json()["results"]
+        self.assertEqual([row["id"] for row in results], [self.report.pk])
+        self.assertEqual(results[0]["activities"], [])
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.get("api_report_list").json()["results"], [])
+        self.assertEqual(self.get("api_report_detail", self.report.pk).status_code, 404)
+
+    def test_filters_on_plan_year(self):
+        self.client.force_login(self.owner)
+        self.assertEqual(len(self.get("api_report_list", year=2023).json()["results"]), 1)
+        self.assertEqual(self.get("api_report_list", year=2024).json()["results"], [])
+
+    def test_keyset_pagination(self):
+        self.client.force_login(self.owner)
+        for plan in self.plans[1:]:
+            Report.objects.create(plan=plan, user=self.owner, reporting_period="yearly")
+        body = self.get("api_report_list", limit=2, fields="plan").json()
+        self.assertEqual([row["plan"] for row in body["results"]], [self.plans[2].pk, self.plans[1].pk])
+        body = self.get("api_report_list", limit=2, fields="plan", cursor=body["next_cursor"]).json()
+        self.assertEqual([row["plan"] for row in body["results"]], [self.plans[0].pk])
+        self.assertIsNone(body["next"])
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+# Version 1 of the read-only JSON API; breaking changes go under a new prefix
+urlpatterns = [
+    path("v1/plans/", views.plan_list, name="api_plan_list"),
+    path("v1/plans/<int:plan_id>/", views.plan_detail, name="api_plan_detail"),
+    path("v1/reports/", views.report_list, name="api_report_list"),
+    path("v1/reports/<int:report_id>/", views.report_detail, name="api_report_detail"),
+]
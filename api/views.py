@@ -0,0 +1,134 @@
+"""
+Read-only JSON API over plans and reports.
+
+Lists and details apply the same visibility rules as the pages. Clients
+pick columns with ``fields=a,b`` and related lists with ``include=x,y``;
+lists also take the filters of api.forms, ``limit`` and the ``cursor``
+from the previous page's ``next_cursor``.
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from plan_report_tourism.replicas import replica_reads
+from plans.models import Plan
+from plans.pagination import keyset_page
+from reports.models import Report
+from .forms import PlanFilterForm, ReportFilterForm
+from .resources import PLANS, REPORTS
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class BadRequest(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+
+
+def api_view(view):
+    """GET only, JSON errors, and a 401 instead of the login redirect."""
+    @replica_reads
+    @require_GET
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"errors": {"auth": ["Authentication required."]}}, status=401)
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as error:
+            return JsonResponse({"errors": error.errors}, status=400)
+    return wrapped
+
+
+def _names(request, key):
+    return [name for name in request.GET.get(key, "").split(",") if name]
+
+
+def selection(request, resource):
+    """Returns (fields, includes) from the query string."""
+    fields = _names(request, "fields") or resource.default_fields
+    includes = set(_names(request, "include"))
+    errors = {}
+    unknown = [name for name in fields if name not in resource.fields]
+    if unknown:
+        errors["fields"] = [f"Unknown field: {name}" for name in unknown]
+    unknown = sorted(includes - set(resource.includes))
+    if unknown:
+        errors["include"] = [f"Unknown include: {name}" for name in unknown]
+    if errors:
+        raise BadRequest(errors)
+
+    # A nested include needs its container's rows to sit in
+    for name in list(includes):
+        within = resource.includes[name].within
+        if within:
+            includes.add(within)
+    return fields, includes
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest({"limit": [f"Enter a whole number from 1 to {MAX_LIMIT}."]})
+    return limit
+
+
+def list_response(request, resource, queryset, filter_form_class):
+    fields, includes = selection(request, resource)
+    form = filter_form_class(request.GET)
+    if not form.is_valid():
+        raise BadRequest(form.errors)
+
+    rows, next_cursor = keyset_page(
+        resource.rows(form.filter(queryset), fields),
+        cursor=request.GET.get("cursor"),
+        page_size=page_limit(request),
+        field=resource.order_field,
+    )
+    resource.attach(rows, includes)
+
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    return JsonResponse({
+        "results": resource.strip(rows, fields),
+        "next_cursor": next_cursor,
+        "next": next_url,
+    })
+
+
+def detail_response(request, resource, queryset):
+    fields, includes = selection(request, resource)
+    row = resource.rows(queryset, fields).first()
+    if row is None:
+        # Also what a plan or report the user may not see looks like
+        return JsonResponse({"errors": {"detail": ["Not found."]}}, status=404)
+    resource.attach([row], includes)
+    return JsonResponse(resource.strip([row], fields)[0])
+
+
+@api_view
+def plan_list(request):
+    return list_response(request, PLANS, Plan.objects.visible_to(request.user), PlanFilterForm)
+
+
+@api_view
+def plan_detail(request, plan_id):
+    return detail_response(request, PLANS, Plan.objects.visible_to(request.user).filter(pk=plan_id))
+
+
+@api_view
+def report_list(request):
+    return list_response(request, REPORTS, Report.objects.visible_to(request.user), ReportFilterForm)
+
+
+@api_view
+def report_detail(request, report_id):
+    return detail_response(request, REPORTS, Report.objects.visible_to(request.user).filter(pk=report_id))
@@ -0,0 +1,171 @@
+"""
+Benchmarks for the critical views against seeded data.
+
+Skipped unless RUN_BENCHMARKS is set:
+
+    RUN_BENCHMARKS=1 python manage.py test benchmarks
+
+Each view is requested once per role at every size in BENCHMARK_SIZES,
+recording query count, wall time and peak Python memory. The sizes grow
+both the organisation and each plan, so a view fails when its query
+count changes between sizes (a query per row) or exceeds its budget in
+budgets.json. Time and memory vary between machines, so their budgets
+are only checked with BENCHMARK_LATENCY=1, on the machine that recorded
+them. Results are written to BENCHMARK_OUTPUT (benchmark-results.json by
+default), and BENCHMARK_RECORD=1 rewrites the budgets from the current
+run.
+"""
+import json
+import math
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection, reset_queries
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from plans.models import Plan
+from plans.seeding import clear_perf_data, seed_perf_data
+from reports.models import Report
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+OUTPUT_PATH = Path(os.environ.get("BENCHMARK_OUTPUT", settings.BASE_DIR / "benchmark-results.json"))
+
+BENCHMARK_SIZES = {
+    "small": {
+        "departments": 2, "users_per_department": 10, "plans_per_user": 2,
+        "goals_per_plan": 1, "kpis_per_plan": 1, "activities_per_plan": 2, "details_per_activity": 1,
+    },
+    "medium": {
+        "departments": 6, "users_per_department": 25, "plans_per_user": 4,
+        "goals_per_plan": 3, "kpis_per_plan": 4, "activities_per_plan": 6, "details_per_activity": 4,
+    },
+}
+
+ROLES = ["individual", "desk", "department", "corporate", "strategic-team", "minister"]
+
+# Recorded time and memory budgets leave this much room for noise
+TIME_HEADROOM = 3
+MEMORY_HEADROOM = 1.5
+
+
+def form_data(form):
+    data = {}
+    for name in form.fields:
+        value = form[name].value()
+        if value is not None:
+            data[form.add_prefix(name)] = value
+    return data
+
+
+def formset_data(formset):
+    data = form_data(formset.management_form)
+    for form in formset.forms:
+        data.update(form_data(form))
+    return data
+
+
+def edit_post_data(context):
+    """Re-submits the edit page unchanged, as the browser would."""
+    data = form_data(context["form"])
+    for name in ("goal_formset", "kpi_formset", "major_activity_formset"):
+        data.update(formset_data(context[name]))
+    for formset in context["detail_formsets"].values():
+        data.update(formset_data(formset))
+    return data
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run the benchmarks")
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ViewBenchmarks(TestCase):
+    def measure(self, request):
+        request()  # warm the caches and code paths
+        # A full query log (under DEBUG) would hide the new queries
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = request()
+            elapsed = time.perf_counter() - started
+        # Read now, the next request clears the query log
+        query_count = len(queries)
+
+        # Traced separately, tracing slows the request down
+        tracemalloc.start()
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertLess(response.status_code, 400, response)
+        return {"queries": query_count, "ms": round(elapsed * 1000, 2), "peak_kib": round(peak / 1024, 1)}
+
+    def requests_for(self, user):
+        """(view name, request) pairs for what ``user`` can do."""
+        get = self.client.get
+        visible = Plan.objects.visible_to(user)
+        own = Plan.objects.filter(user=user)
+
+        requests = [("dashboard", lambda: get(reverse("dashboard")))]
+        plan = visible.order_by("pk").first()
+        if plan:
+            requests.append(("view_plan", lambda: get(reverse("view_plan", args=[plan.pk]))))
+        draft = own.filter(status="DRAFT").order_by("pk").first()
+        if draft:
+            url = reverse("edit_plan", args=[draft.pk])
+            data = edit_post_data(get(url).context)
+            requests.append(("edit_plan GET", lambda: get(url)))
+            requests.append(("edit_plan POST", lambda: self.client.post(url, data)))
+        approved = own.filter(status="APPROVED").order_by("pk").first()
+        if approved:
+            requests.append(("create_report", lambda: get(reverse("create_report", args=[approved.pk]))))
+        report = Report.objects.filter(plan__in=visible).exclude(status="DRAFT").order_by("pk").first()
+        if report:
+            requests.append(("view_report", lambda: get(reverse("view_report", args=[report.pk]))))
+        return requests
+
+    def test_views_within_budget(self):
+        budgets = json.loads(BUDGETS_PATH.read_text()) if BUDGETS_PATH.exists() else {}
+        results = []
+        for size, sizes in BENCHMARK_SIZES.items():
+            clear_perf_data()
+            seed_perf_data(**sizes)
+            for role in ROLES:
+                user = User.objects.filter(username__startswith="perf-", role=role).order_by("pk").first()
+                self.client.force_login(user)
+                for view, request in self.requests_for(user):
+                    results.append({"view": view, "role": role, "size": size, **self.measure(request)})
+
+        OUTPUT_PATH.write_text(json.dumps({"sizes": BENCHMARK_SIZES, "results": results}, indent=2))
+
+        if os.environ.get("BENCHMARK_RECORD"):
+            budgets = {}
+            for result in results:
+                budget = budgets.setdefault(result["view"], {"queries": 0, "ms": 0, "peak_kib": 0})
+                budget["queries"] = max(budget["queries"], result["queries"])
+                budget["ms"] = max(budget["ms"], math.ceil(result["ms"] * TIME_HEADROOM))
+                budget["peak_kib"] = max(budget["peak_kib"], math.ceil(result["peak_kib"] * MEMORY_HEADROOM))
+            BUDGETS_PATH.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
+            return
+
+        metrics = ["queries"]
+        if os.environ.get("BENCHMARK_LATENCY"):
+            metrics += ["ms", "peak_kib"]
+        for result in results:
+            budget = budgets.get(result["view"])
+            with self.subTest(view=result["view"], role=result["role"], size=result["size"]):
+                self.assertIsNotNone(budget, "no budget recorded; run with BENCHMARK_RECORD=1")
+                for metric in metrics:
+                    self.assertLessEqual(result[metric], budget[metric], f"{metric} over budget: {result}")
+
+        # Bigger plans and organisations must not cost more queries
+        counts = {}
+        for result in results:
+            counts.setdefault((result["view"], result["role"]), {})[result["size"]] = result["queries"]
+        for (view, role), by_size in counts.items():
+            with self.subTest(view=view, role=role):
+                self.assertEqual(len(set(by_size.values())), 1, f"query count varies with size: {by_size}")
@@ -0,0 +1,116 @@
+"""
+Flat, spreadsheet-shaped views of the plan and report tables.
+
+Every dataset is a values_list() projection scoped to a queryset of
+plans, and the report datasets also to a queryset of reports, so an
+export never builds model instances and always applies the same
+visibility rules as the dashboard and the report pages.
+"""
+from collections import namedtuple
+
+from plans.models import KPI, DetailActivity, MajorActivity, Plan, StrategicGoal
+from reports.models import KPIReport, MajorActivityReport
+
+EXPORT_CHUNK_SIZE = 2000
+
+# plan_field: the lookup from the dataset's model to its plan ("pk" for Plan);
+# report_field: the lookup to its report, for report rows
+Dataset = namedtuple("Dataset", ["name", "title", "model", "plan_field", "columns", "report_field"],
+                     defaults=[None])
+
+DATASETS = {dataset.name: dataset for dataset in [
+    Dataset("plans", "Plans", Plan, "pk", [
+        ("Plan ID", "pk"),
+        ("Owner", "user__username"),
+        ("Department", "user__department__name"),
+        ("Level", "level"),
+        ("Plan Type", "plan_type"),
+        ("Year", "year"),
+        ("Quarter", "quarter_number"),
+        ("Month", "month"),
+        ("Week", "week_number"),
+        ("Pillar", "pillar"),
+        ("Status", "status"),
+        ("Current Reviewer", "current_reviewer_role"),
+        ("Created At", "created_at"),
+    ]),
+    Dataset("goals", "Goals", StrategicGoal, "plan", [
+        ("Goal ID", "pk"),
+        ("Plan ID", "plan_id"),
+        ("Title", "title"),
+    ]),
+    Dataset("kpis", "KPIs", KPI, "plan", [
+        ("KPI ID", "pk"),
+        ("Plan ID", "plan_id"),
+        ("Name", "name"),
+        ("Measurement", "measurement"),
+        ("Baseline", "baseline"),
+        ("Target", "target"),
+        ("Q1 Target", "target_q1"),
+        ("Q2 Target", "target_q2"),
+        ("Q3 Target", "target_q3"),
+        ("Q4 Target", "target_q4"),
+    ]),
+    Dataset("major_activities", "Major Activities", MajorActivity, "plan", [
+        ("Activity ID", "pk"),
+        ("Plan ID", "plan_id"),
+        ("Major Activity", "major_activity"),
+        ("Weight", "weight"),
+        ("Budget", "budget"),
+        ("Responsible Person", "responsible_person__username"),
+    ]),
+    Dataset("detail_activities", "Detail Activities", DetailActivity, "major_activity__plan", [
+        ("Detail ID", "pk"),
+        ("Activity ID", "major_activity_id"),
+        ("Detail Activity", "detail_activity"),
+        ("Weight", "weight"),
+        ("Responsible Person", "responsible_person__username"),
+        ("Status", "status"),
+    ]),
+    Dataset("kpi_reports", "KPI Reports", KPIReport, "report__plan", [
+        ("Row ID", "pk"),
+        ("Report ID", "report_id"),
+        ("Plan ID", "report__plan_id"),
+        ("Reporting Period", "report__reporting_period"),
+        ("Report Status", "report__status"),
+        ("KPI ID", "kpi_id"),
+        ("KPI", "kpi__name"),
+        ("Actual", "actual_value"),
+        ("Achievement %", "achievement_percent"),
+        ("Remark", "remark"),
+    ], report_field="report"),
+    Dataset("activity_reports", "Activity Reports", MajorActivityReport, "report__plan", [
+        ("Row ID", "pk"),
+        ("Report ID", "report_id"),
+        ("Plan ID", "report__plan_id"),
+        ("Reporting Period", "report__reporting_period"),
+        ("Report Status", "report__status"),
+        ("Activity ID", "major_activity_id"),
+        ("Major Activity", "major_activity__major_activity"),
+        ("Progress %", "progress"),
+        ("Budget Used", "actual_budget_used"),
+        ("Challenge", "challenge"),
+        ("Mitigation", "mitigation"),
+    ], report_field="report"),
+]}
+
+
+def headers(dataset):
+    return [header for header, _ in dataset.columns]
+
+
+def dataset_rows(dataset, plans, reports=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the dataset's rows for ``plans`` as tuples, one chunk in memory
+    at a time. Report rows are also limited to ``reports`` when given
+    (Report.objects.visible_to keeps other users' drafts out).
+    """
+    rows = dataset.model.objects.filter(**{f"{dataset.plan_field}__in": plans.values("pk")})
+    if reports is not None and dataset.report_field:
+        rows = rows.filter(**{f"{dataset.report_field}__in": reports.values("pk")})
+    return (
+        rows
+        .order_by("pk")
+        .values_list(*[lookup for _, lookup in dataset.columns])
+        .iterator(chunk_size=chunk_size)
+    )
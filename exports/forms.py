@@ -0,0 +1,25 @@
+from django import forms
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput(attrs={
+            "class": "px-3 py-2 border rounded-md",
+            "accept": ".xlsx,.csv",
+        }))
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleFileField, self).clean(item, initial) for item in data]
+        return [super().clean(data, initial)]
+
+
+class PlanImportForm(forms.Form):
+    files = MultipleFileField(
+        help_text="An Excel workbook with the export's sheets, or one CSV per sheet (plans.csv, kpis.csv, ...).",
+    )
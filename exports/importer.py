@@ -0,0 +1,291 @@
+"""
+Bulk import of plans prepared offline in spreadsheets.
+
+The files use the same sheets and headers as the exports: a workbook
+with Plans, Goals, KPIs, Major Activities and Detail Activities sheets,
+or one CSV per sheet named after the dataset (plans.csv, kpis.csv, ...).
+The "Plan ID" and "Activity ID" columns are references local to the
+file that tie child rows to their parents.
+
+Every row is validated before anything is written, with the model
+fields' own cleaning and the editor's plan rules, and the rows are then
+inserted with bulk_create in one transaction. Imported plans belong to
+the importing user and start as drafts, as if entered in create_plan.
+"""
+import csv
+import io
+import os
+from collections import defaultdict, namedtuple
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from plans.dashboard_cache import invalidate
+from plans.models import KPI, DetailActivity, MajorActivity, Plan, StrategicGoal
+from plans.validation import (
+    QUARTER_TARGET_FIELDS,
+    detail_weight_error,
+    kpi_target_errors,
+    plan_period_errors,
+)
+from .datasets import DATASETS
+from .xlsx import read_workbook
+
+User = get_user_model()
+
+IMPORT_DATASETS = ["plans", "goals", "kpis", "major_activities", "detail_activities"]
+
+RowError = namedtuple("RowError", ["sheet", "row", "message"])
+
+
+class ImportFileError(Exception):
+    """The uploaded file cannot be read as an import source."""
+
+
+def _table(rows):
+    """(row number, {header: value}) for each non-empty row after the header."""
+    rows = iter(rows)
+    header = [name.strip() for name in next(rows, [])]
+    for number, row in enumerate(rows, 2):
+        if any(value.strip() for value in row):
+            yield number, dict(zip(header, row))
+
+
+def read_tables(files):
+    """
+    Reads (filename, file object) pairs into {dataset name: rows}.
+    Unrelated sheets and files are ignored.
+    """
+    titles = {DATASETS[name].title: name for name in IMPORT_DATASETS}
+    tables = {}
+    for filename, fileobj in files:
+        stem, extension = os.path.splitext(os.path.basename(filename))
+        extension = extension.lower()
+        if extension == ".xlsx":
+            try:
+                sheets = read_workbook(fileobj)
+            except Exception as e:
+                raise ImportFileError(f"{filename} is not a readable XLSX workbook.") from e
+            for title, rows in sheets.items():
+                if title in titles:
+                    tables[titles[title]] = list(_table(rows))
+        elif extension == ".csv":
+            # Exported file names carry a "-<year>" suffix
+            name = stem.split("-")[0]
+            if name in IMPORT_DATASETS:
+                text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+                tables[name] = list(_table(csv.reader(text)))
+                text.detach()
+        else:
+            raise ImportFileError(f"{filename}: only .xlsx and .csv files can be imported.")
+    return tables
+
+
+class ImportResult:
+    def __init__(self):
+        self.errors = []
+        self.counts = {}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def summary(self):
+        return ", ".join(f"{count} {DATASETS[name].title.lower()}" for name, count in self.counts.items())
+
+
+class PlanImporter:
+    def __init__(self, owner):
+        self.owner = owner
+        self.result = ImportResult()
+        # References of parent rows that failed validation, by child lookup
+        self.failed = defaultdict(set)
+
+    # --- Cell parsing ---
+
+    def error(self, sheet, number, message):
+        self.result.errors.append(RowError(DATASETS[sheet].title, number, message))
+
+    def header(self, sheet, lookup):
+        return next(header for header, column in DATASETS[sheet].columns if column == lookup)
+
+    def clean(self, sheet, number, row, model, name, optional=False):
+        """
+        Cleans one cell with the model field. Blank cells give None for
+        nullable or ``optional`` fields and the field default otherwise.
+        """
+        header = self.header(sheet, name)
+        raw = (row.get(header) or "").strip()
+        field = model._meta.get_field(name)
+        try:
+            if not raw:
+                if optional or field.null or field.blank:
+                    return None
+                if field.has_default():
+                    return field.to_python(field.get_default())
+                raise ValidationError("This field is required.")
+            return field.clean(raw, None)
+        except ValidationError as e:
+            self.error(sheet, number, f"{header}: {' '.join(e.messages)}")
+            raise
+
+    def clean_row(self, sheet, number, row, model, names, optional=()):
+        """Cleans several cells, reporting every bad one; None if any failed."""
+        values, failed = {}, False
+        for name in names:
+            try:
+                values[name] = self.clean(sheet, number, row, model, name, name in optional)
+            except ValidationError:
+                failed = True
+        return None if failed else values
+
+    def reference(self, sheet, number, row, lookup, known):
+        header = self.header(sheet, lookup)
+        ref = (row.get(header) or "").strip()
+        if ref in self.failed[lookup]:
+            # The parent row was already reported
+            return None
+        if ref not in known:
+            self.error(sheet, number, f"{header}: unknown reference {ref!r}.")
+            return None
+        return known[ref]
+
+    def responsible(self, sheet, number, row):
+        header = self.header(sheet, "responsible_person__username")
+        username = (row.get(header) or "").strip()
+        if not username:
+            return None
+        if username not in self.users:
+            self.error(sheet, number, f"{header}: no user named {username!r}.")
+        return self.users.get(username)
+
+    # --- Sheets ---
+
+    def run(self, tables):
+        usernames = {
+            (row.get("Responsible Person") or "").strip()
+            for sheet in ("major_activities", "detail_activities")
+            for _, row in tables.get(sheet, [])
+        }
+        self.users = User.objects.in_bulk(usernames - {""}, field_name="username")
+
+        plans = self.read_plans(tables.get("plans", []))
+        goals = self.read_goals(tables.get("goals", []), plans)
+        kpis = self.read_kpis(tables.get("kpis", []), plans)
+        majors = self.read_majors(tables.get("major_activities", []), plans)
+        details = self.read_details(tables.get("detail_activities", []), majors)
+
+        if not plans and self.result.ok:
+            self.error("plans", 1, "The file contains no plans.")
+        if not self.result.ok:
+            return self.result
+
+        with transaction.atomic():
+            Plan.objects.bulk_create(plans.values())
+            StrategicGoal.objects.bulk_create(goals)
+            KPI.objects.bulk_create(kpis)
+            MajorActivity.objects.bulk_create(majors.values())
+            DetailActivity.objects.bulk_create(details)
+            # bulk_create sends no signals; the drafts only show on the owner's dashboard
+            invalidate([f"user:{self.owner.pk}"])
+
+        self.result.counts = {
+            "plans": len(plans),
+            "goals": len(goals),
+            "kpis": len(kpis),
+            "major_activities": len(majors),
+            "detail_activities": len(details),
+        }
+        return self.result
+
+    def read_plans(self, rows):
+        pillar = self.owner.department.pillar if self.owner.department_id else None
+        plans = {}
+        for number, row in rows:
+            ref = (row.get("Plan ID") or "").strip()
+            if not ref or ref in plans or ref in self.failed["plan_id"]:
+                self.error("plans", number, f"Plan ID: {ref!r} is missing or repeated.")
+                continue
+            values = self.clean_row("plans", number, row, Plan,
+                                    ["plan_type", "year", "quarter_number", "month", "week_number"])
+            if values is None:
+                self.failed["plan_id"].add(ref)
+                continue
+            for field, message in plan_period_errors(values["plan_type"], values).items():
+                self.error("plans", number, f"{self.header('plans', field)}: {message}")
+            plans[ref] = Plan(
+                user=self.owner, level=self.owner.role.lower(), pillar=pillar, status="DRAFT", **values
+            )
+        return plans
+
+    def read_goals(self, rows, plans):
+        goals = []
+        for number, row in rows:
+            plan = self.reference("goals", number, row, "plan_id", plans)
+            values = self.clean_row("goals", number, row, StrategicGoal, ["title"])
+            if plan and values:
+                goals.append(StrategicGoal(plan=plan, **values))
+        return goals
+
+    def read_kpis(self, rows, plans):
+        kpis = []
+        for number, row in rows:
+            plan = self.reference("kpis", number, row, "plan_id", plans)
+            values = self.clean_row("kpis", number, row, KPI,
+                                    ["name", "measurement", "baseline", "target", *QUARTER_TARGET_FIELDS],
+                                    optional=QUARTER_TARGET_FIELDS)
+            if not (plan and values):
+                continue
+            for field, message in kpi_target_errors(plan.plan_type, values).items():
+                self.error("kpis", number, f"{self.header('kpis', field)}: {message}")
+            if plan.plan_type != "yearly":
+                # As in create_plan, only yearly plans keep quarterly targets
+                values.update(dict.fromkeys(QUARTER_TARGET_FIELDS, 0))
+            kpis.append(KPI(plan=plan, **values))
+        return kpis
+
+    def read_majors(self, rows, plans):
+        majors = {}
+        for number, row in rows:
+            ref = (row.get("Activity ID") or "").strip()
+            if not ref or ref in majors or ref in self.failed["major_activity_id"]:
+                self.error("major_activities", number, f"Activity ID: {ref!r} is missing or repeated.")
+                continue
+            plan = self.reference("major_activities", number, row, "plan_id", plans)
+            values = self.clean_row("major_activities", number, row, MajorActivity,
+                                    ["major_activity", "weight", "budget"])
+            responsible = self.responsible("major_activities", number, row)
+            if not (plan and values):
+                self.failed["major_activity_id"].add(ref)
+                continue
+            majors[ref] = MajorActivity(plan=plan, responsible_person=responsible, **values)
+            majors[ref].import_row = number
+        return majors
+
+    def read_details(self, rows, majors):
+        details = []
+        weights = defaultdict(list)
+        for number, row in rows:
+            major = self.reference("detail_activities", number, row, "major_activity_id", majors)
+            values = self.clean_row("detail_activities", number, row, DetailActivity,
+                                    ["detail_activity", "weight", "status"])
+            responsible = self.responsible("detail_activities", number, row)
+            if not (major and values):
+                continue
+            detail = DetailActivity(major_activity=major, responsible_person=responsible, **values)
+            weights[id(major)].append(detail.weight)
+            details.append(detail)
+
+        # The detail formset's rule, for every activity that has detail rows
+        for major in majors.values():
+            if id(major) in weights:
+                error = detail_weight_error(weights[id(major)], major.weight)
+                if error:
+                    self.error("major_activities", major.import_row, error)
+        return details
+
+
+def import_plans(files, owner):
+    """Reads and imports ``files``; returns an ImportResult."""
+    return PlanImporter(owner).run(read_tables(files))
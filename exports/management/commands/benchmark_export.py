@@ -0,0 +1,105 @@
+import os
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from exports.datasets import DATASETS, dataset_rows, headers
+from exports.views import csv_chunks
+from exports.xlsx import stream_workbook
+from plans.models import KPI, DetailActivity, MajorActivity, Plan
+from reports.models import MajorActivityReport, Report
+
+ACTIVITIES_PER_PLAN = 50
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the CSV and XLSX exports and reports their peak Python memory. "
+        "With --activities, a synthetic dataset is seeded inside a transaction "
+        "that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--activities", type=int, default=100_000,
+                            help="Major activities to seed (0 exports the existing data)")
+
+    def handle(self, *args, activities=100_000, **options):
+        with transaction.atomic():
+            if activities:
+                started = time.perf_counter()
+                plans = self.seed(activities)
+                self.stdout.write(f"Seeded {activities} activities in {time.perf_counter() - started:.1f}s")
+            else:
+                plans = Plan.objects.all()
+
+            self.measure("csv", lambda: self.export_csv(plans))
+            self.measure("xlsx", lambda: self.export_xlsx(plans))
+            transaction.set_rollback(True)
+
+    def measure(self, label, export):
+        started = time.perf_counter()
+        size = export()
+        elapsed = time.perf_counter() - started
+
+        # Measured separately, tracing slows the export down
+        tracemalloc.start()
+        export()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"{label}: {size / 1024 / 1024:.1f} MiB in {elapsed:.2f}s, "
+            f"peak Python memory {peak / 1024 / 1024:.1f} MiB"
+        )
+
+    def export_csv(self, plans):
+        size = 0
+        with open(os.devnull, "w") as sink:
+            for dataset in DATASETS.values():
+                for chunk in csv_chunks(headers(dataset), dataset_rows(dataset, plans)):
+                    size += sink.write(chunk)
+        return size
+
+    def export_xlsx(self, plans):
+        sheets = [
+            (dataset.title, headers(dataset), dataset_rows(dataset, plans))
+            for dataset in DATASETS.values()
+        ]
+        size = 0
+        with open(os.devnull, "wb") as sink:
+            for chunk in stream_workbook(sheets):
+                size += sink.write(chunk)
+        return size
+
+    def seed(self, activities):
+        """One KPI, one report and ACTIVITIES_PER_PLAN activities (each with a detail) per plan."""
+        owner = User.objects.create_user("benchmark-export", role="individual")
+        plan_count = max(1, activities // ACTIVITIES_PER_PLAN)
+        plans = Plan.objects.bulk_create([
+            Plan(user=owner, level="individual", plan_type="yearly", year=2000 + i % 30)
+            for i in range(plan_count)
+        ], batch_size=1000)
+        KPI.objects.bulk_create([
+            KPI(plan=plan, name="Visitors", baseline=0, target=400, target_q1=100)
+            for plan in plans
+        ], batch_size=1000)
+        reports = Report.objects.bulk_create([
+            Report(plan=plan, user=owner, reporting_period="yearly") for plan in plans
+        ], batch_size=1000)
+
+        majors = MajorActivity.objects.bulk_create([
+            MajorActivity(plan=plans[i % plan_count], major_activity=f"Activity {i}", weight=2, budget=1000)
+            for i in range(activities)
+        ], batch_size=1000)
+        DetailActivity.objects.bulk_create([
+            DetailActivity(major_activity=major, detail_activity=f"Detail of {major.major_activity}", weight=2)
+            for major in majors
+        ], batch_size=1000)
+        MajorActivityReport.objects.bulk_create([
+            MajorActivityReport(report=reports[i % plan_count], major_activity=major, progress=50)
+            for i, major in enumerate(majors)
+        ], batch_size=1000)
+        return Plan.objects.filter(user=owner)
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from exports.importer import ImportFileError, import_plans
+
+
+class Command(BaseCommand):
+    help = "Imports plans with their goals, KPIs and activities from an XLSX workbook or CSV files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", help="A workbook, or one CSV per sheet")
+        parser.add_argument("--user", required=True, help="Username that will own the imported plans")
+
+    def handle(self, *args, files=(), user=None, **options):
+        try:
+            owner = get_user_model().objects.select_related("department").get(username=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {user!r}.")
+
+        try:
+            handles = [open(path, "rb") for path in files]
+        except OSError as e:
+            raise CommandError(str(e))
+        try:
+            result = import_plans([(handle.name, handle) for handle in handles], owner)
+        except ImportFileError as e:
+            raise CommandError(str(e))
+        finally:
+            for handle in handles:
+                handle.close()
+
+        for error in result.errors:
+            self.stderr.write(f"{error.sheet}, row {error.row}: {error.message}")
+        if not result.ok:
+            raise CommandError(f"Nothing was imported: {len(result.errors)} problems.")
+        self.stdout.write(self.style.SUCCESS(f"Imported {result.summary()}."))
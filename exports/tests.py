@@ -0,0 +1,215 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from plans.models import KPI, DetailActivity, MajorActivity, Plan
+from reports.models import MajorActivityReport, Report
+from .datasets import DATASETS
+from .views import csv_chunks
+from .xlsx import CONTENT_TYPE as XLSX_CONTENT_TYPE, stream_workbook
+
+
+class ExportTestData:
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", role="individual")
+        cls.other = User.objects.create_user("other", role="individual")
+        cls.plans = []
+        for year in (2024, 2025):
+            plan = Plan.objects.create(user=cls.owner, level="individual", plan_type="yearly", year=year)
+            KPI.objects.create(plan=plan, name="Visitors", baseline=0, target=100, target_q1=25)
+            activity = MajorActivity.objects.create(
+                plan=plan, major_activity="Campaign", weight=5, budget=500, responsible_person=cls.owner
+            )
+            DetailActivity.objects.create(major_activity=activity, detail_activity="Print flyers", weight=5)
+            report = Report.objects.create(plan=plan, user=cls.owner, reporting_period="yearly")
+            MajorActivityReport.objects.create(report=report, major_activity=activity, progress=40)
+            cls.plans.append(plan)
+        Plan.objects.create(user=cls.other, level="individual", plan_type="yearly", year=2025)
+
+
+class CsvExportTests(ExportTestData, TestCase):
+    def export(self, name, **params):
+        response = self.client.get(reverse("export_csv", args=[name]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_exports_only_visible_plans(self):
+        self.client.force_login(self.owner)
+        rows = self.export("plans")
+        self.assertEqual(rows[0][:2], ["Plan ID", "Owner"])
+        self.assertEqual({row[0] for row in rows[1:]}, {str(plan.pk) for plan in self.plans})
+
+    def test_dashboard_filters_apply_to_child_rows(self):
+        self.client.force_login(self.owner)
+        rows = self.export("detail_activities", year=2025)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2], "Print flyers")
+
+        rows = self.export("activity_reports")
+        self.assertEqual([row[7] for row in rows[1:]], ["40.00", "40.00"])
+
+    def test_other_users_draft_reports_stay_out(self):
+        desk = User.objects.create_user("desk", role="desk")
+        User.objects.filter(pk=self.owner.pk).update(desk=desk)
+        Plan.objects.filter(user=self.owner).update(status="APPROVED")
+        self.client.force_login(desk)
+        self.assertEqual(len(self.export("plans")), 3)
+        self.assertEqual(len(self.export("activity_reports")), 1)
+
+        Report.objects.filter(plan=self.plans[0]).update(status="SUBMITTED")
+        rows = self.export("activity_reports")
+        self.assertEqual([row[2] for row in rows[1:]], [str(self.plans[0].pk)])
+
+    def test_one_query_per_dataset(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse("export_csv", args=["major_activities"]))
+        # The rows are only read once the body is consumed
+        with self.assertNumQueries(1):
+            content = b"".join(response.streaming_content)
+        self.assertIn(b"Campaign,5.00,500.00,owner", content)
+
+    def test_chunked_output(self):
+        chunks = list(csv_chunks(["n"], ([i] for i in range(5)), rows_per_chunk=2))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual("".join(chunks).split(), ["n", "0", "1", "2", "3", "4"])
+
+    def test_unknown_dataset(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse("export_csv", args=["users"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class XlsxExportTests(ExportTestData, TestCase):
+    NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+    def read_sheet(self, archive, index):
+        root = ElementTree.fromstring(archive.read(f"xl/worksheets/sheet{index}.xml"))
+        values = {f"{{{self.NS['x']}}}t", f"{{{self.NS['x']}}}v"}
+        return [
+            [node.text for node in row.iter() if node.tag in values]
+            for row in root.iterfind("x:sheetData/x:row", self.NS)
+        ]
+
+    def test_workbook_has_a_sheet_per_dataset(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse("export_xlsx"), {"year": 2025})
+        with self.assertNumQueries(len(DATASETS)):
+            content = b"".join(response.streaming_content)
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        self.assertIsNone(archive.testzip())
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        names = [sheet.get("name") for sheet in workbook.iterfind("x:sheets/x:sheet", self.NS)]
+        self.assertEqual(names, [dataset.title for dataset in DATASETS.values()])
+
+        kpis = self.read_sheet(archive, names.index("KPIs") + 1)
+        self.assertEqual(kpis[0][6], "Q1 Target")
+        self.assertEqual(len(kpis), 2)
+        self.assertEqual(kpis[1][2:], ["Visitors", "0.0", "100.0", "25.0", "0.0", "0.0", "0.0"])
+
+    def test_rows_are_flushed_while_streaming(self):
+        rows = ([i, f"row <{i}>", None] for i in range(100))
+        chunks = list(stream_workbook([("Numbers", ["n", "label", "empty"], rows)], rows_per_flush=10))
+        self.assertGreater(len(chunks), 10)
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        sheet = self.read_sheet(archive, 1)
+        self.assertEqual(len(sheet), 101)
+        self.assertEqual(sheet[5], ["4", "row <4>"])
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command("benchmark_export", activities=100, stdout=out)
+        self.assertIn("xlsx:", out.getvalue())
+        # The seeded rows are rolled back
+        self.assertFalse(User.objects.filter(username="benchmark-export").exists())
+
+
+def upload(name, header, *rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([header, *rows])
+    return SimpleUploadedFile(name, buffer.getvalue().encode())
+
+
+class PlanImportTests(ExportTestData, TestCase):
+    PLAN_HEADER = ["Plan ID", "Plan Type", "Year", "Quarter", "Month", "Week"]
+    KPI_HEADER = ["Plan ID", "Name", "Baseline", "Target", "Q1 Target", "Q2 Target", "Q3 Target", "Q4 Target"]
+    MAJOR_HEADER = ["Activity ID", "Plan ID", "Major Activity", "Weight", "Budget", "Responsible Person"]
+    DETAIL_HEADER = ["Activity ID", "Detail Activity", "Weight", "Responsible Person", "Status"]
+
+    def setUp(self):
+        self.importer = User.objects.create_user("importer", role="individual")
+        self.client.force_login(self.importer)
+
+    def post(self, *files):
+        return self.client.post(reverse("import_plans"), {"files": list(files)})
+
+    def test_workbook_round_trip(self):
+        self.client.force_login(self.owner)
+        workbook = b"".join(self.client.get(reverse("export_xlsx")).streaming_content)
+
+        self.client.force_login(self.importer)
+        with self.assertNumQueries(9):
+            # One user lookup, one insert per table and the savepoint pair
+            response = self.post(SimpleUploadedFile("plans.xlsx", workbook))
+        self.assertRedirects(response, reverse("dashboard"), fetch_redirect_response=False)
+
+        imported = Plan.objects.filter(user=self.importer)
+        self.assertEqual(sorted(imported.values_list("year", flat=True)), [2024, 2025])
+        self.assertTrue(all(plan.status == "DRAFT" for plan in imported))
+        activity = MajorActivity.objects.get(plan__in=imported, plan__year=2025)
+        self.assertEqual(activity.responsible_person, self.owner)
+        self.assertEqual(activity.budget, 500)
+        self.assertEqual(activity.detail_activities.get().detail_activity, "Print flyers")
+        self.assertEqual(KPI.objects.get(plan=activity.plan).target_q1, 25)
+
+    def test_rule_violations_are_reported_per_row(self):
+        response = self.post(
+            upload("plans.csv", self.PLAN_HEADER, ["p1", "yearly", "2026"], ["p2", "quarterly", "2026"],
+                   ["p3", "daily", "2026"]),
+            upload("kpis.csv", self.KPI_HEADER, ["p1", "Visitors", "0", "100", "25", "", "25", "25"]),
+            upload("major_activities.csv", self.MAJOR_HEADER,
+                   ["a1", "p1", "Campaign", "10", "100", "nobody"], ["a2", "p3", "Fair", "5", "0", ""]),
+            upload("detail_activities.csv", self.DETAIL_HEADER, ["a1", "Flyers", "4", "", ""]),
+        )
+        self.assertEqual(response.status_code, 200)
+        errors = {(error.sheet, error.row, error.message.split(":")[0]) for error in response.context["errors"]}
+        self.assertEqual(errors, {
+            ("Plans", 3, "Quarter"),
+            ("Plans", 4, "Plan Type"),
+            ("KPIs", 2, "Q2 Target"),
+            ("Major Activities", 2, "Responsible Person"),
+            ("Major Activities", 2, "Total detail activity weight (4.00) must equal major activity weight (10)."),
+        })
+        self.assertFalse(Plan.objects.filter(user=self.importer).exists())
+
+    def test_command_imports_csv_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for name, header, rows in [
+            ("plans.csv", self.PLAN_HEADER, [["p1", "monthly", "2026", "", "3"]]),
+            ("kpis.csv", self.KPI_HEADER, [["p1", "Visitors", "0", "100"]]),
+        ]:
+            with open(os.path.join(directory, name), "wb") as handle:
+                handle.write(upload(name, header, *rows).read())
+
+        out = io.StringIO()
+        call_command("import_plans", os.path.join(directory, "plans.csv"),
+                     os.path.join(directory, "kpis.csv"), user="importer", stdout=out)
+        self.assertIn("Imported 1 plans, 0 goals, 1 kpis", out.getvalue())
+        kpi = KPI.objects.get(plan__user=self.importer)
+        self.assertEqual((kpi.plan.month, kpi.target_q1), (3, 0))
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.export_index, name="export_index"),
+    path("import/", views.import_plans_view, name="import_plans"),
+    path("workbook.xlsx", views.export_xlsx, name="export_xlsx"),
+    path("<slug:name>.csv", views.export_csv, name="export_csv"),
+]
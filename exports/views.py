@@ -0,0 +1,110 @@
+import csv
+import io
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import redirect, render
+
+from plan_report_tourism.replicas import replica_reads
+from plans.forms import DashboardFilterForm
+from plans.models import Plan
+from reports.models import Report
+from .datasets import DATASETS, dataset_rows, headers
+from .forms import PlanImportForm
+from .importer import ImportFileError, import_plans
+from .xlsx import CONTENT_TYPE as XLSX_CONTENT_TYPE, stream_workbook
+
+# Rows written to the buffer before a chunk is sent
+CSV_ROWS_PER_CHUNK = 500
+
+
+def export_plans(request):
+    """The plans the user may see, narrowed by the dashboard filters."""
+    plans = Plan.objects.visible_to(request.user)
+    return DashboardFilterForm(request.GET).filter(plans)
+
+
+def csv_chunks(header, rows, rows_per_chunk=CSV_ROWS_PER_CHUNK):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_filename(request, name, extension):
+    year = request.GET.get("year", "")
+    suffix = f"-{year}" if year.isdigit() else ""
+    return f"{name}{suffix}.{extension}"
+
+
+@replica_reads
+@login_required
+def export_index(request):
+    form = DashboardFilterForm(request.GET)
+    return render(request, "exports/index.html", {
+        "datasets": DATASETS.values(),
+        "filter_form": form,
+        "query": request.GET.urlencode(),
+    })
+
+
+@replica_reads
+@login_required
+def export_csv(request, name):
+    """Streams one dataset as CSV, starting before the query has finished."""
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise Http404("Unknown export.")
+
+    rows = dataset_rows(dataset, export_plans(request), Report.objects.visible_to(request.user))
+    response = StreamingHttpResponse(csv_chunks(headers(dataset), rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(request, name, "csv")}"'
+    return response
+
+
+@replica_reads
+@login_required
+def export_xlsx(request):
+    """Streams every dataset as one workbook with a sheet per entity."""
+    plans = export_plans(request)
+    reports = Report.objects.visible_to(request.user)
+    sheets = [
+        (dataset.title, headers(dataset), dataset_rows(dataset, plans, reports))
+        for dataset in DATASETS.values()
+    ]
+    response = StreamingHttpResponse(stream_workbook(sheets), content_type=XLSX_CONTENT_TYPE)
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(request, "plans", "xlsx")}"'
+    return response
+
+
+@login_required
+def import_plans_view(request):
+    """Imports the user's plans from an uploaded workbook or CSV files."""
+    result = None
+    if request.method == "POST":
+        form = PlanImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                result = import_plans(
+                    [(upload.name, upload) for upload in form.cleaned_data["files"]], request.user
+                )
+            except ImportFileError as e:
+                form.add_error("files", str(e))
+            else:
+                if result.ok:
+                    messages.success(request, f"Imported {result.summary()}.")
+                    return redirect("dashboard")
+    else:
+        form = PlanImportForm()
+
+    return render(request, "exports/import.html", {
+        "form": form,
+        "errors": result.errors if result else [],
+    })
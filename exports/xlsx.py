@@ -0,0 +1,227 @@
+"""
+Minimal streaming XLSX writer (and reader) built on zipfile.
+
+Each sheet is written as inline-string worksheet XML straight into the
+zip member while its rows are read, so neither the rows nor the
+workbook are ever held in memory. The archive is written to an
+unseekable sink, which makes zipfile use data descriptors and lets the
+bytes be sent as soon as each row batch is compressed.
+"""
+import datetime
+import re
+import zipfile
+from decimal import Decimal
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Rows written between flushes of the compressed output
+ROWS_PER_FLUSH = 1000
+
+# Characters XML 1.0 cannot represent
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+{sheets}
+</Types>"""
+
+SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets>{sheets}</sheets>
+</workbook>"""
+
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{sheets}
+<Relationship Id="rIdStyles" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# Style 1 is the bold header row
+STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>
+</styleSheet>"""
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = "</sheetData></worksheet>"
+
+
+def cell(value, style=""):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"{style}><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c{style}><v>{value}</v></c>'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat(sep=" ", timespec="seconds") if isinstance(value, datetime.datetime) else value.isoformat()
+    text = escape(ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def row_xml(number, values, style=""):
+    return f'<row r="{number}">{"".join(cell(value, style) for value in values)}</row>'
+
+
+class StreamSink:
+    """Unseekable file object that hands written bytes back in pieces."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def stream_workbook(sheets, rows_per_flush=ROWS_PER_FLUSH):
+    """
+    Yields the bytes of an XLSX workbook.
+    ``sheets`` is a list of (title, headers, rows); each ``rows`` iterable
+    is consumed lazily while its sheet is written.
+    """
+    sink = StreamSink()
+    indexes = range(1, len(sheets) + 1)
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES.format(
+            sheets="\n".join(SHEET_CONTENT_TYPE.format(index=index) for index in indexes)
+        ))
+        archive.writestr("_rels/.rels", ROOT_RELS)
+        archive.writestr("xl/workbook.xml", WORKBOOK.format(sheets="".join(
+            f'<sheet name={quoteattr(title[:31])} sheetId="{index}" r:id="rId{index}"/>'
+            for index, (title, _, _) in zip(indexes, sheets)
+        )))
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS.format(sheets="\n".join(
+            f'<Relationship Id="rId{index}" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{index}.xml"/>'
+            for index in indexes
+        )))
+        archive.writestr("xl/styles.xml", STYLES)
+        yield sink.drain()
+
+        for index, (_, header, rows) in zip(indexes, sheets):
+            with archive.open(f"xl/worksheets/sheet{index}.xml", "w") as sheet:
+                sheet.write(SHEET_START.encode())
+                pending = [row_xml(1, header, ' s="1"')]
+                for number, row in enumerate(rows, 2):
+                    pending.append(row_xml(number, row))
+                    if number % rows_per_flush == 0:
+                        sheet.write("".join(pending).encode())
+                        pending = []
+                        yield sink.drain()
+                pending.append(SHEET_END)
+                sheet.write("".join(pending).encode())
+            yield sink.drain()
+    yield sink.drain()
+
+
+def write_workbook(fileobj, sheets):
+    """Writes the workbook to ``fileobj``; returns the number of bytes written."""
+    size = 0
+    for chunk in stream_workbook(sheets):
+        fileobj.write(chunk)
+        size += len(chunk)
+    return size
+
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def column_index(reference):
+    """Zero-based column of a cell reference such as "C12"."""
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord("A") + 1
+    return index - 1
+
+
+def _text(node):
+    return "".join(t.text or "" for t in node.iter(f"{MAIN_NS}t"))
+
+
+def read_workbook(fileobj):
+    """
+    Reads an XLSX workbook into {sheet title: iterator of rows}, each
+    row a list of cell strings. Sheets are parsed incrementally as their
+    rows are consumed.
+    """
+    archive = zipfile.ZipFile(fileobj)
+
+    shared = []
+    if "xl/sharedStrings.xml" in archive.namelist():
+        with archive.open("xl/sharedStrings.xml") as part:
+            for _, node in ElementTree.iterparse(part):
+                if node.tag == f"{MAIN_NS}si":
+                    shared.append(_text(node))
+                    node.clear()
+
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target").lstrip("/") for rel in rels.iter(f"{PACKAGE_REL_NS}Relationship")}
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+
+    sheets = {}
+    for sheet in workbook.iter(f"{MAIN_NS}sheet"):
+        target = targets[sheet.get(f"{REL_NS}id")]
+        path = target if target.startswith("xl/") else f"xl/{target}"
+        sheets[sheet.get("name")] = _sheet_rows(archive, path, shared)
+    return sheets
+
+
+def _sheet_rows(archive, path, shared):
+    with archive.open(path) as part:
+        for _, node in ElementTree.iterparse(part):
+            if node.tag != f"{MAIN_NS}row":
+                continue
+            row = []
+            for position, cell_node in enumerate(node.iterfind(f"{MAIN_NS}c")):
+                index = column_index(cell_node.get("r", "")) if cell_node.get("r") else position
+                kind = cell_node.get("t")
+                value_node = cell_node.find(f"{MAIN_NS}v")
+                if kind == "inlineStr":
+                    value = _text(cell_node)
+                elif value_node is None:
+                    value = ""
+                elif kind == "s":
+                    value = shared[int(value_node.text)]
+                else:
+                    value = value_node.text or ""
+                row.extend([""] * (index - len(row)))
+                row.append(value)
+            node.clear()
+            yield row
@@ -0,0 +1,35 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .timing import current_timer
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timer = current_timer()
+        if timer is None:
+            return super().render(context, request)
+        # Templates rendered from inside another render are already counted
+        timer.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timer.render_depth -= 1
+            if not timer.render_depth:
+                timer.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, with each render added to the current
+    request's RequestTimer. Selected in settings only while request
+    timing is enabled.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
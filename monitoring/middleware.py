@@ -0,0 +1,65 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .timing import start_timer, stop_timer, view_stats
+
+logger = logging.getLogger("monitoring")
+
+
+class RequestTimingMiddleware:
+    """
+    Counts queries and times the database and template rendering for
+    each request. Adds a Server-Timing header to responses for staff
+    users, logs slow requests with their most repeated queries (the
+    signature of an N+1 loop) and feeds the per-view percentiles shown
+    at the request stats endpoint.
+
+    With REQUEST_TIMING_ENABLED off the middleware removes itself from
+    the chain at startup, so it costs nothing.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_TIMING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "REQUEST_TIMING_SLOW_MS", 500)
+
+    def __call__(self, request):
+        timer = start_timer()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            stop_timer()
+
+        total_ms = timer.total_seconds * 1000
+        db_ms = timer.db_seconds * 1000
+        template_ms = timer.template_seconds * 1000
+        # The timings describe the server, so only staff get to see them
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={db_ms:.1f};desc="{timer.queries} queries"',
+                f"tpl;dur={template_ms:.1f}",
+                f"total;dur={total_ms:.1f}",
+            ])
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unresolved"
+        view_stats.record(view, total_ms, timer.queries)
+
+        if total_ms >= self.slow_ms:
+            repeated = "; ".join(f"{count}x {shape}" for shape, count in timer.repeated_queries())
+            logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, templates %.0f ms. Repeated: %s",
+                request.method, request.path, view, total_ms, timer.queries, db_ms, template_ms,
+                repeated or "none",
+            )
+        return response
+
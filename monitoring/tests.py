@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from plans.models import Plan
+from .backends import TimedTemplate
+from .middleware import RequestTimingMiddleware
+from .timing import RequestTimer, fingerprint, percentile, view_stats
+
+
+TIMED_TEMPLATES = [{**settings.TEMPLATES[0], "BACKEND": "monitoring.backends.TimedDjangoTemplates"}]
+
+
+@override_settings(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SLOW_MS=0, TEMPLATES=TIMED_TEMPLATES)
+class RequestTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", role="individual")
+        cls.staff = User.objects.create_user("admin", role="individual", is_staff=True)
+        for year in range(2020, 2025):
+            Plan.objects.create(user=cls.user, level="individual", plan_type="yearly", year=year)
+
+    def setUp(self):
+        view_stats.clear()
+
+    def test_server_timing_header(self):
+        self.client.force_login(self.staff)
+        with self.assertLogs("monitoring", "WARNING"):
+            response = self.client.get(reverse("dashboard"))
+        header = response["Server-Timing"]
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+        self.assertNotIn("tpl;dur=0.0,", header)
+
+    def test_server_timing_is_staff_only(self):
+        self.client.force_login(self.user)
+        with self.assertLogs("monitoring", "WARNING"):
+            response = self.client.get(reverse("dashboard"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_slow_request_log(self):
+        self.client.force_login(self.user)
+        plan = Plan.objects.first()
+        with self.assertLogs("monitoring", "WARNING") as logs:
+            self.client.get(reverse("view_plan", args=[plan.pk]))
+        self.assertIn(f"Slow request GET /plans/{plan.pk}/ (view_plan)", logs.output[0])
+
+    def test_repeated_queries_are_grouped(self):
+        timer = RequestTimer()
+        with connection.execute_wrapper(timer):
+            for plan in Plan.objects.order_by("pk"):
+                User.objects.get(pk=plan.user_id)
+        (shape, count), = timer.repeated_queries()
+        self.assertEqual(count, 5)
+        self.assertIn('FROM "accounts_user" WHERE "accounts_user"."id" = %s', shape)
+        self.assertEqual(timer.queries, 6)
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.force_login(self.user)
+        with self.assertLogs("monitoring", "WARNING"):
+            self.client.get(reverse("dashboard"))
+            response = self.client.get(reverse("request_stats"))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(self.staff)
+        with self.assertLogs("monitoring", "WARNING"):
+            stats = self.client.get(reverse("request_stats")).json()["views"]
+        self.assertEqual(stats["dashboard"]["requests"], 1)
+        self.assertIn("p99_ms", stats["dashboard"])
+
+    def test_stats_reset_needs_a_csrf_post(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.staff)
+        with self.assertLogs("monitoring", "WARNING"):
+            client.get(reverse("dashboard"))
+            stats = client.get(reverse("request_stats"), {"reset": 1}).json()["views"]
+            self.assertEqual(stats["dashboard"]["requests"], 1)
+            self.assertEqual(client.post(reverse("request_stats")).status_code, 403)
+            self.assertTrue(view_stats.summary())
+
+            token = client.get(reverse("dashboard")).cookies["csrftoken"].value
+            response = client.post(reverse("request_stats"), HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.json(), {"views": {}})
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_disabled_middleware_is_removed(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestTimingMiddleware(lambda request: HttpResponse())
+
+    def test_templates_render_untimed_outside_requests(self):
+        template = engines.all()[0].from_string("{{ value }}")
+        self.assertIsInstance(template, TimedTemplate)
+        self.assertEqual(template.render({"value": "ok"}), "ok")
+
+    def test_fingerprint_and_percentile(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM plans_plan WHERE id IN (%s, %s, %s) AND year = 2024 LIMIT 21"),
+            "SELECT * FROM plans_plan WHERE id IN (?) AND year = ? LIMIT ?",
+        )
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 99), 4)
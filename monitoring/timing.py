@@ -0,0 +1,119 @@
+"""
+Per-request measurements collected by RequestTimingMiddleware.
+
+A RequestTimer is bound to the current thread for the duration of a
+request. Queries reach it through connection.execute_wrapper, and
+template rendering through the TimedDjangoTemplates backend in
+monitoring.backends, which settings select when timing is enabled.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+_local = threading.local()
+
+# Literals that differ between otherwise identical queries
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """The query's shape, with literals and IN lists collapsed to ``?``."""
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _IN_LISTS.sub("(?)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class RequestTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.fingerprints = Counter()
+        self.render_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[sql] += 1
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+    def repeated_queries(self, limit=3):
+        """[(fingerprint, count)] of the queries run more than once, most frequent first."""
+        shapes = Counter()
+        for sql, count in self.fingerprints.items():
+            shapes[fingerprint(sql)] += count
+        return [(shape, count) for shape, count in shapes.most_common(limit) if count > 1]
+
+
+def current_timer():
+    return getattr(_local, "timer", None)
+
+
+def start_timer():
+    _local.timer = RequestTimer()
+    return _local.timer
+
+
+def stop_timer():
+    _local.timer = None
+
+
+class ViewStats:
+    """Recent request durations per view, kept in this process."""
+
+    def __init__(self, window=500):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+        self.counts = Counter()
+
+    def record(self, view, milliseconds, queries):
+        with self.lock:
+            self.samples[view].append((milliseconds, queries))
+            self.counts[view] += 1
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+            self.counts.clear()
+
+    def summary(self):
+        with self.lock:
+            snapshot = {view: list(samples) for view, samples in self.samples.items()}
+            counts = dict(self.counts)
+        summary = {}
+        for view, samples in sorted(snapshot.items()):
+            durations = sorted(ms for ms, _ in samples)
+            summary[view] = {
+                "requests": counts[view],
+                "window": len(durations),
+                "p50_ms": percentile(durations, 50),
+                "p90_ms": percentile(durations, 90),
+                "p99_ms": percentile(durations, 99),
+                "max_ms": durations[-1],
+                "mean_queries": round(sum(q for _, q in samples) / len(samples), 1),
+            }
+        return summary
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return round(ordered[int(index)], 2)
+
+
+view_stats = ViewStats()
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("request-stats/", views.request_stats, name="request_stats"),
+]
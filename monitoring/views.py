@@ -0,0 +1,17 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from .timing import view_stats
+
+
+@staff_member_required
+@require_http_methods(["GET", "POST"])
+def request_stats(request):
+    """
+    Per-view latency percentiles of the recent requests served by this
+    process. A POST (with the CSRF token) clears them first.
+    """
+    if request.method == "POST":
+        view_stats.clear()
+    return JsonResponse({"views": view_stats.summary()})
@@ -0,0 +1,110 @@
+"""
+Read-replica routing for the read-heavy views.
+
+Views decorated with @replica_reads (the dashboard, plan and report
+pages and the exports) read from the "replica" database on GET and
+HEAD. Everything else, and every write, uses the primary.
+
+Replicas lag behind the primary, so a session that has written plan or
+report data is pinned to the primary from then on, and its own edits
+never seem to vanish. With REPLICA_READS off (no DATABASE_REPLICA_URL)
+the middleware removes itself and all reads stay on the primary.
+"""
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = "replica"
+PINNED_SESSION_KEY = "_db_pinned_to_primary"
+# Writes to these apps pin the session; a login's last_login update does not
+PINNING_APPS = {"plans", "reports", "rollups"}
+
+_local = threading.local()
+
+
+def replica_reads(view):
+    """Marks a view whose GET and HEAD requests may read from the replica."""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        return view(*args, **kwargs)
+    wrapped.replica_reads = True
+    return wrapped
+
+
+def reading_from_replica():
+    return getattr(_local, "replica", False) and not getattr(_local, "wrote", False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return REPLICA_ALIAS
+        return self.off_replica(hints)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in PINNING_APPS:
+            _local.wrote = True
+        return self.off_replica(hints)
+
+    def off_replica(self, hints):
+        """
+        Django follows an instance's own database by default; objects
+        read from the replica are written, and their related rows read
+        after a write, on the primary.
+        """
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db == REPLICA_ALIAS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db != REPLICA_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Turns replica reads on for @replica_reads views, including the
+    streamed body of a StreamingHttpResponse, and pins sessions that
+    wrote. Goes after SessionMiddleware, so the pin is saved with the
+    session.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REPLICA_READS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _local.replica = _local.wrote = False
+        try:
+            response = self.get_response(request)
+            if _local.wrote:
+                request.session[PINNED_SESSION_KEY] = True
+            if response.streaming and _local.replica:
+                response.streaming_content = self.streamed_from_replica(response.streaming_content)
+        finally:
+            _local.replica = _local.wrote = False
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # The session and the signed-in user always come from the primary
+        request.user.is_authenticated
+        _local.replica = (
+            getattr(view_func, "replica_reads", False)
+            and request.method in ("GET", "HEAD")
+            and not request.session.get(PINNED_SESSION_KEY, False)
+        )
+
+    def streamed_from_replica(self, content):
+        _local.replica = True
+        try:
+            yield from content
+        finally:
+            _local.replica = False
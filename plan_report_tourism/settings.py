@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from .database import database_from_env, replica_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +43,10 @@ INSTALLED_APPS = [
     "accounts",
     "plans",
     "reports",
+    "rollups",
+    "exports",
+    "monitoring",
+    "api",
     
      
 ]
@@ -48,21 +54,32 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "accounts.User"
 
 MIDDLEWARE = [
+    "monitoring.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "plan_report_tourism.replicas.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "plan_report_tourism.urls"
 
+# Request timing (Server-Timing headers for staff, slow request log,
+# per-view stats); off unless REQUEST_TIMING_ENABLED=1
+REQUEST_TIMING_ENABLED = os.environ.get("REQUEST_TIMING_ENABLED") == "1"
+REQUEST_TIMING_SLOW_MS = int(os.environ.get("REQUEST_TIMING_SLOW_MS", "500"))
+
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # The timed backend adds template rendering to the request timings
+        "BACKEND": (
+            "monitoring.backends.TimedDjangoTemplates" if REQUEST_TIMING_ENABLED
+            else "django.template.backends.django.DjangoTemplates"
+        ),
       
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         "APP_DIRS": True,
@@ -82,12 +99,15 @@ WSGI_APPLICATION = "plan_report_tourism.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite by default, PostgreSQL when DATABASE_URL is set, see database.py
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": database_from_env(os.environ, BASE_DIR / "db.sqlite3"),
 }
+DATABASES["replica"] = replica_database(os.environ, DATABASES["default"])
+
+# Dashboard, plan, report and export reads go to the replica, see replicas.py
+REPLICA_READS = bool(os.environ.get("DATABASE_REPLICA_URL"))
+DATABASE_ROUTERS = ["plan_report_tourism.replicas.ReplicaRouter"]
 
 
 # Password validation
@@ -133,6 +153,31 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Dashboard plan lists and their generation counters, see plans/dashboard_cache.py.
+# The dashboard cache needs a cache shared by every worker: set CACHE_DIR to use
+# the file cache, or DASHBOARD_CACHE_SINGLE_PROCESS=1 if only one worker runs.
+# Otherwise data derived from the user table is only cached briefly, see
+# accounts/utils.py.
+CACHE_DIR = os.environ.get("CACHE_DIR")
+DASHBOARD_CACHE_SINGLE_PROCESS = os.environ.get("DASHBOARD_CACHE_SINGLE_PROCESS") == "1"
+CACHES = {
+    "default": {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache" if CACHE_DIR
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": CACHE_DIR or "plan-report-tourism",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {"monitoring": {"handlers": ["console"], "level": "WARNING"}},
+}
+
 #Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 LOGIN_REDIRECT_URL = 'dashboard'
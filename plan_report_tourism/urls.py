@@ -2,9 +2,13 @@ from django.contrib import admin
 from django.urls import path, include
 
 urlpatterns = [
+    path('admin/monitoring/', include('monitoring.urls')), # Staff-only request stats
     path('admin/', admin.site.urls),
     path('', include('plans.urls')), # Main app for plans and reports
     path('reports/', include('reports.urls')), # New reports app
+    path('rollups/', include('rollups.urls')), # Pillar / ministry roll-ups
+    path('exports/', include('exports.urls')), # CSV / spreadsheet exports
+    path('api/', include('api.urls')), # Read-only JSON API
     path('accounts/', include('accounts.urls')), # For any future account-related views
     
 
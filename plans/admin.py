@@ -133,12 +133,15 @@ class PlanAdmin(admin.ModelAdmin):
 
     
     date_hierarchy = "created_at"
-    
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_totals()
+
     # This calls the @property method on the Plan model
     def get_total_budget(self, obj):
         return obj.total_budget
     get_total_budget.short_description = 'Total Budget'
-    get_total_budget.admin_order_field = 'major_activities__budget'
+    get_total_budget.admin_order_field = 'budget_sum'
 # Register remaining models to be visible in the Admin interface (optional but good practice)
 # admin.site.register(StrategicGoal)
 # admin.site.register(KPI)
@@ -0,0 +1,67 @@
+"""
+ETag and Last-Modified validators for the plan and report pages.
+
+Each page's validators come from a single query that also applies the
+page's access rules and loads the page's plan or report row, so a
+browser revalidating a page it already has gets a 304 without the plan
+tree being loaded or rendered, and a full render reuses the row rather
+than reading it again. A user who may not see the page gets no
+validators and falls through to the view's usual 404 or 403.
+
+The pages differ per viewer (their approve buttons and CSRF token), so
+the ETag also covers the viewer, their CSRF secret and the user table
+version.
+"""
+import hashlib
+from functools import wraps
+
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from accounts.utils import user_table_version
+
+
+def viewer_etag(request, *parts):
+    # Creates the CSRF secret now if this is the first visit, so the
+    # ETag sent with the page matches the one its revalidation computes
+    get_token(request)
+    key = ":".join(str(part) for part in (
+        *parts,
+        request.user.pk,
+        request.META["CSRF_COOKIE"],
+        user_table_version(),
+    ))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def conditional_page(validators):
+    """
+    Decorates a view with ETag and Last-Modified handling.
+    ``validators(request, *args, **kwargs)`` returns (etag, last_modified,
+    row) or None; it is called once per request, and the view finds the
+    row it loaded in ``request.page_object`` (None if the user may not
+    see the page).
+    """
+    def decorator(view):
+        def cached_validators(request, *args, **kwargs):
+            if not hasattr(request, "_page_validators"):
+                etag, last_modified, request.page_object = (
+                    validators(request, *args, **kwargs) or (None, None, None)
+                )
+                request._page_validators = etag, last_modified
+            return request._page_validators
+
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: cached_validators(request, *args, **kwargs)[0],
+            last_modified_func=lambda request, *args, **kwargs: cached_validators(request, *args, **kwargs)[1],
+        )(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Browsers revalidate on every visit and shared caches keep out
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapped
+    return decorator
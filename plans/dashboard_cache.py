@@ -0,0 +1,123 @@
+"""
+Cache for the dashboard's rendered plan list.
+
+A cached list is keyed on the viewer, their role and department, the
+query string and a generation counter for each scope the viewer sees
+plans through: their own (user), the reviewer queue and pillar scope of
+their role, and their department. Saving or deleting a plan or report
+bumps the generations of every scope that can see it, so the next load
+misses and renders afresh; stale entries are never read again and just
+expire.
+
+Generations live in the default cache, so it must be shared by every
+worker process (the file cache): with a per-process cache such as
+locmem, an invalidation in one worker never reaches the others. The
+dashboard cache is therefore off on a process-local backend unless
+DASHBOARD_CACHE_SINGLE_PROCESS says only one worker runs.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+
+from accounts.utils import cache_is_shared, user_table_version
+from .permissions import PLAN_APPROVAL_FLOW
+
+DASHBOARD_CACHE_TIMEOUT = 10 * 60
+GENERATION_KEY = "plans:dashboard-generation:{}"
+
+# Stands in for the per-request CSRF token in the cached HTML
+CSRF_PLACEHOLDER = "dashboard-csrf-token"
+
+def enabled():
+    """False on a process-local cache, unless only one worker process runs."""
+    return cache_is_shared()
+
+
+def _fresh_generation():
+    # Time based, so an evicted counter never comes back with an old value
+    return time.time_ns()
+
+
+def generations(scopes):
+    keys = [GENERATION_KEY.format(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _fresh_generation(), timeout=None)
+        found.update(cache.get_many(missing))
+    return [found[key] for key in keys]
+
+
+def bump_generations(scopes):
+    for scope in scopes:
+        key = GENERATION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_generation(), timeout=None)
+
+
+def viewer_scopes(user):
+    scopes = [f"user:{user.pk}", f"role:{(user.role or '').lower()}"]
+    if user.department_id:
+        scopes.append(f"department:{user.department_id}")
+    return scopes
+
+
+def plan_scopes(plan, owner):
+    """
+    Scopes that can see ``plan``: its owner, the owner's desk, department
+    and pillar, and every role along its approval chain (the reviewer
+    queues and the pillar, strategic team and minister scopes).
+    ``owner`` is a dict with the owner's desk, department and pillar.
+    """
+    scopes = {f"user:{plan.user_id}"}
+    if owner.get("desk"):
+        scopes.add(f"user:{owner['desk']}")
+    if owner.get("department"):
+        scopes.add(f"department:{owner['department']}")
+    if owner.get("department__pillar"):
+        # The pillar head sees every plan of the pillar's departments
+        scopes.add(f"role:{owner['department__pillar']}")
+
+    role = plan.level
+    while role in PLAN_APPROVAL_FLOW:
+        role = PLAN_APPROVAL_FLOW[role]
+        if role == "pillar":
+            role = owner.get("department__pillar") or plan.pillar
+            if not role:
+                break
+        scopes.add(f"role:{role}")
+    if plan.current_reviewer_role:
+        scopes.add(f"role:{plan.current_reviewer_role}")
+    return scopes
+
+
+def invalidate(scopes):
+    """
+    Bumps now, and again once the transaction commits: a list rendered
+    by another request in between still showed the old rows.
+    """
+    scopes = set(scopes)
+    bump_generations(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_generations(scopes))
+
+
+def dashboard_cache_key(user, params):
+    query = urlencode(sorted(params.lists()), doseq=True)
+    digest = hashlib.md5(query.encode()).hexdigest()
+    versions = ":".join(str(generation) for generation in generations(viewer_scopes(user)))
+    return (
+        f"plans:dashboard:{user.pk}:{(user.role or '').lower()}:{user.department_id}:"
+        f"{digest}:{versions}:{user_table_version()}"
+    )
+
+
+def with_csrf_token(html, request):
+    return html.replace(CSRF_PLACEHOLDER, get_token(request))
@@ -5,36 +5,103 @@ from django.core.exceptions import ValidationError
 from decimal import Decimal
 from .models import Plan, StrategicGoal, KPI, MajorActivity, DetailActivity
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from accounts.utils import user_data_timeout, user_table_version
+from .validation import detail_weight_error, kpi_target_errors, plan_period_errors
 from .models import Plan, Department
 # Get the User Model for ForeignKey fields
 User = get_user_model()
 
+
+def responsible_person_choices():
+    """
+    Choices for the responsible person dropdowns. Built once per version
+    of the user table and shared by every activity form on a page.
+    """
+    cache_key = f"plans:responsible-person-choices:{user_table_version()}"
+    choices = cache.get(cache_key)
+    if choices is None:
+        choices = [("", "---------")] + [
+            (user.pk, str(user)) for user in User.objects.order_by('username')
+        ]
+        cache.set(cache_key, choices, user_data_timeout())
+    return choices
+
 # Base Tailwind class for inputs
 INPUT_CLASS = 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-blue-500 focus:border-blue-500 transition duration-150 ease-in-out shadow-sm'
 
-class BaseDetailActivityFormSet(BaseInlineFormSet):
-    def clean(self):
-        super().clean()
+class LoadedRowField(forms.ModelChoiceField):
+    """A formset's row id, looked up among the rows the formset loaded."""
+
+    def __init__(self, rows, *args, **kwargs):
+        self.rows = rows
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        row = self.rows.get(str(value))
+        if row is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return row
 
-        total_weight = Decimal("0.00")
 
-        for form in self.forms:
-            if self.can_delete and form.cleaned_data.get("DELETE"):
-                continue
-            if not form.cleaned_data:
-                continue
+class LoadedRowsFormSet(BaseInlineFormSet):
+    """
+    Checks each posted row id against the rows already loaded for the
+    formset, instead of fetching every row again by its id.
+    """
+    def loaded_rows(self):
+        if not hasattr(self, '_loaded_rows'):
+            self._loaded_rows = {str(row.pk): row for row in self.get_queryset()}
+        return self._loaded_rows
 
-            weight = form.cleaned_data.get("weight")
-            if weight:
-                total_weight += weight
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        name = self.model._meta.pk.name
+        field = form.fields[name]
+        form.fields[name] = LoadedRowField(
+            self.loaded_rows(), field.queryset, initial=field.initial, required=False, widget=field.widget
+        )
+
+
+class ResponsiblePersonField(forms.TypedChoiceField):
+    """
+    Checked against the shared responsible person choices, so a row costs
+    no user lookup (nor the model's second check that the user exists).
+    The form sets the instance's ``responsible_person_id`` itself.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(
+            coerce=int, empty_value=None, required=False,
+            widget=forms.Select(attrs={'class': INPUT_CLASS}), **kwargs
+        )
+
+
+class BaseDetailActivityFormSet(LoadedRowsFormSet):
+    def __init__(self, *args, rows=None, **kwargs):
+        # Rows loaded up front, e.g. with every major activity of the plan
+        self.rows = rows
+        super().__init__(*args, **kwargs)
+
+    def get_queryset(self):
+        if self.rows is not None:
+            return self.rows
+        return super().get_queryset()
+
+    def clean(self):
+        super().clean()
+
+        weights = [
+            form.cleaned_data.get("weight")
+            for form in self.forms
+            if form.cleaned_data and not (self.can_delete and form.cleaned_data.get("DELETE"))
+        ]
+        error = detail_weight_error(weights, self.instance.weight)
+        if error:
+            raise ValidationError(error)
 
-        major_weight = self.instance.weight
 
-        if total_weight != major_weight:
-            raise ValidationError(
-                f"Total detail activity weight ({total_weight}) "
-                f"must equal major activity weight ({major_weight})."
-            )
 class PlanCreationForm(forms.ModelForm):
     """
     The main form for the Plan model, which will be used in conjunction with the formsets.
@@ -90,12 +157,8 @@ class PlanCreationForm(forms.ModelForm):
                 cleaned_data[field] = None
 
         # Add validation logic based on the plan type
-        if plan_type == 'weekly' and not cleaned_data.get('week_number'):
-            self.add_error('week_number', 'Week number is required for a weekly plan.')
-        if plan_type == 'monthly' and not cleaned_data.get('month'):
-            self.add_error('month', 'Month is required for a monthly plan.')
-        if plan_type == 'quarterly' and not cleaned_data.get('quarter_number'):
-            self.add_error('quarter_number', 'Quarter number is required for a quarterly plan.')
+        for field, message in plan_period_errors(plan_type, cleaned_data).items():
+            self.add_error(field, message)
         
         return cleaned_data
     
@@ -111,7 +174,7 @@ class StrategicGoalForm(forms.ModelForm):
             'title': forms.TextInput(attrs={'class': 'w-full px-3 py-2 border rounded-md', 'placeholder': 'Enter a strategic goal'}),
         }
         
-StrategicGoalFormset = inlineformset_factory(Plan, StrategicGoal, form=StrategicGoalForm, extra=1, can_delete=True)
+StrategicGoalFormset = inlineformset_factory(Plan, StrategicGoal, form=StrategicGoalForm, formset=LoadedRowsFormSet, extra=1, can_delete=True)
 
 
 # --- KPI Form and Formset ---
@@ -147,40 +210,13 @@ class KPIForm(forms.ModelForm):
     def clean(self):
         cleaned_data = super().clean()
         
-        if self.plan_type == 'yearly':
-            q_fields = ['target_q1', 'target_q2', 'target_q3', 'target_q4']
-            q_values = [cleaned_data.get(f) for f in q_fields]
-            yearly_target = cleaned_data.get('target')
-            
-            # --- Check 1: Ensure quarterly targets are provided ---
-            if any(q is None for q in q_values) and (self.has_changed() or self.instance.pk):
-                for field_name in q_fields:
-                    if cleaned_data.get(field_name) is None:
-                        self.add_error(field_name, "Required for a Yearly Plan.")
-                        
-                q_values = [cleaned_data.get(f) for f in q_fields]
-
-            # --- Check 2: Progressive Target Validation (Q1 <= Q2 <= Q3 <= Q4) ---
-            # if all(q is not None for q in q_values):
-            #     if not (q_values[0] <= q_values[1] <= q_values[2] <= q_values[3]):
-            #         raise forms.ValidationError(
-            #             "Quarterly targets must be progressive (non-decreasing): Q1 ≤ Q2 ≤ Q3 ≤ Q4."
-            #         )
-                
-                # --- Check 3: Total Target must equal Q4 Target ---
-                q4_target = q_values[0]+ q_values[1]+ q_values[2] + q_values[3] 
-                
-                if yearly_target is None:
-                    self.add_error('target', "Total target is required for a Yearly Plan.")
-                
-                # Check within a small tolerance for floating point numbers
-                # elif abs(yearly_target - q4_target) > 0.001: 
-                #      self.add_error('target', 
-                #          f"Target Mismatch: The Total Target ({yearly_target}) must exactly equal the Q4 Target ({q4_target}) for progressive metrics."
-                #         )
+        # Quarterly targets are only required once the row is in use
+        if self.has_changed() or self.instance.pk:
+            for field, message in kpi_target_errors(self.plan_type, cleaned_data).items():
+                self.add_error(field, message)
 
         return cleaned_data    
-KPIFormset = inlineformset_factory(Plan, KPI, form=KPIForm, extra=1, can_delete=True)
+KPIFormset = inlineformset_factory(Plan, KPI, form=KPIForm, formset=LoadedRowsFormSet, extra=1, can_delete=True)
 
 
 # MAJOR ACTIVITY FORMSET
@@ -190,29 +226,38 @@ class MajorActivityForm(forms.ModelForm):
     Form for a single Major Activity.
     The budget is the editable field here.
     """
+    responsible_person = ResponsiblePersonField()
+
     class Meta:
         model = MajorActivity
         # *** CORRECTED: Removed calculated properties (total_weight, total_budget) ***
-        fields = ['major_activity','weight', 'budget', 'responsible_person'] 
+        fields = ['major_activity','weight', 'budget'] 
 
         widgets = {
             'major_activity': forms.TextInput(attrs={'class': INPUT_CLASS, 'placeholder': 'Major Activity Title'}),
             # Budget is the editable field
             'weight': forms.NumberInput(attrs={'class': INPUT_CLASS, 'placeholder': 'Weight (e.g., 25.00)'}), 
             'budget': forms.NumberInput(attrs={'class': INPUT_CLASS, 'placeholder': 'Allocated Budget'}), 
-            'responsible_person': forms.Select(attrs={'class': INPUT_CLASS}), # Use Select for ForeignKey
         }
     
     def __init__(self, *args, **kwargs):
+        responsible_choices = kwargs.pop('responsible_choices', None)
         super().__init__(*args, **kwargs)
-        # Optional: Set queryset for responsible person
-        self.fields['responsible_person'].queryset = User.objects.all().order_by('username')
+        # Render from the shared choice list instead of querying per form
+        self.fields['responsible_person'].choices = responsible_choices or responsible_person_choices()
+        self.initial.setdefault('responsible_person', self.instance.responsible_person_id)
+
+    def clean_responsible_person(self):
+        person = self.cleaned_data['responsible_person']
+        self.instance.responsible_person_id = person
+        return person
 
 
 MajorActivityFormset = inlineformset_factory(
     Plan,
     MajorActivity,
     form=MajorActivityForm,
+    formset=LoadedRowsFormSet,
     extra=1,
     can_delete=True
 )
@@ -225,10 +270,12 @@ class DetailActivityForm(forms.ModelForm):
     Form for a single Detail Activity.
     Weight is the editable field here.
     """
+    responsible_person = ResponsiblePersonField()
+
     class Meta:
         model = DetailActivity
         # *** CORRECTED: Removed 'budget' which is not a field on DetailActivity model ***
-        fields = ['detail_activity', 'weight', 'responsible_person', 'status']
+        fields = ['detail_activity', 'weight', 'status']
 
         widgets = {
             'detail_activity': forms.Textarea(attrs={
@@ -237,14 +284,20 @@ class DetailActivityForm(forms.ModelForm):
                 'placeholder': 'Detailed steps to complete the Major Activity',
             }),
             'weight': forms.NumberInput(attrs={'class': INPUT_CLASS, 'placeholder': 'Weight (e.g., 25.00)'}),
-            'responsible_person': forms.Select(attrs={'class': INPUT_CLASS}), # Use Select for ForeignKey
             'status': forms.Select(attrs={'class': INPUT_CLASS}),
         }
         
     def __init__(self, *args, **kwargs):
+        responsible_choices = kwargs.pop('responsible_choices', None)
         super().__init__(*args, **kwargs)
-        # Optional: Set queryset for responsible person
-        self.fields['responsible_person'].queryset = User.objects.all().order_by('username')
+        # Render from the shared choice list instead of querying per form
+        self.fields['responsible_person'].choices = responsible_choices or responsible_person_choices()
+        self.initial.setdefault('responsible_person', self.instance.responsible_person_id)
+
+    def clean_responsible_person(self):
+        person = self.cleaned_data['responsible_person']
+        self.instance.responsible_person_id = person
+        return person
 
 
 DetailActivityFormset = inlineformset_factory(
@@ -257,3 +310,107 @@ DetailActivityFormset = inlineformset_factory(
 )
 
 
+# --- EDIT FORMSETS (no blank extra rows) ---
+
+StrategicGoalFormsetEdit = inlineformset_factory(
+    Plan, StrategicGoal,
+    form=StrategicGoalForm,
+    formset=LoadedRowsFormSet,
+    extra=0,
+    can_delete=True
+)
+
+KPIFormsetEdit = inlineformset_factory(
+    Plan, KPI,
+    form=KPIForm,
+    formset=LoadedRowsFormSet,
+    extra=0,
+    can_delete=True
+)
+
+MajorActivityFormsetEdit = inlineformset_factory(
+    Plan, MajorActivity,
+    form=MajorActivityForm,
+    formset=LoadedRowsFormSet,
+    extra=0,
+    can_delete=True
+)
+
+DetailActivityFormsetEdit = inlineformset_factory(
+    MajorActivity, DetailActivity,
+    form=DetailActivityForm,
+    formset=BaseDetailActivityFormSet,
+    extra=0,
+    can_delete=True
+)
+
+
+
+
+class DashboardFilterForm(forms.Form):
+    """
+    Server-side filters for the dashboard plan list.
+    """
+    FILTER_CLASS = 'px-3 py-2 border rounded-md'
+
+    year = forms.IntegerField(
+        required=False,
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': FILTER_CLASS, 'placeholder': 'Year'})
+    )
+    plan_type = forms.ChoiceField(
+        choices=[('', 'All Types')] + Plan.PLAN_TYPE_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': FILTER_CLASS})
+    )
+    status = forms.ChoiceField(
+        choices=[('', 'All Statuses')] + Plan.WORKFLOW_STATUS,
+        required=False,
+        widget=forms.Select(attrs={'class': FILTER_CLASS})
+    )
+    level = forms.ChoiceField(
+        choices=[('', 'All Levels')] + Plan.LEVEL_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': FILTER_CLASS})
+    )
+
+    def filter(self, queryset):
+        """Applies every filter that was provided and is valid."""
+        self.is_valid()  # cleaned_data keeps the fields that did validate
+        lookups = {
+            name: value for name, value in self.cleaned_data.items()
+            if value not in (None, '')
+        }
+        return queryset.filter(**lookups)
+
+
+class IdListField(forms.Field):
+    """Whole-number ids posted as a repeated field, without duplicates."""
+    widget = forms.MultipleHiddenInput
+    default_error_messages = {'invalid': 'Enter whole-number IDs.'}
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return list(dict.fromkeys(int(item) for item in value))
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid'], code='invalid')
+
+
+class BatchReviewForm(forms.Form):
+    """
+    A reviewer's approve or reject action on many plans (or reports) at
+    once; ``ids`` is repeated once per row.
+    """
+    MAX_IDS = 500
+
+    ids = IdListField()
+    action = forms.ChoiceField(choices=[('approve', 'Approve'), ('reject', 'Reject')])
+    comment = forms.CharField(required=False, widget=forms.Textarea)
+
+    def clean_ids(self):
+        ids = self.cleaned_data['ids']
+        if len(ids) > self.MAX_IDS:
+            raise ValidationError(f"Review at most {self.MAX_IDS} at a time.")
+        return ids
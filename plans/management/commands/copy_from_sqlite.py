@@ -0,0 +1,149 @@
+"""
+Copies every table of a SQLite database into the default database,
+for moving an existing site onto PostgreSQL:
+
+    DATABASE_URL=postgres://... python manage.py migrate
+    DATABASE_URL=postgres://... python manage.py copy_from_sqlite db.sqlite3
+
+Tables are copied parents first, in primary key order, a batch at a
+time, and keep their primary keys. The whole copy is one transaction on
+the target, and the target's id sequences are moved past the copied
+keys at the end.
+"""
+import os
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.management.sql import sql_flush
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from plan_report_tourism.database import sqlite_database
+
+SOURCE_ALIAS = "sqlite-source"
+
+# Rows that migrate creates by itself, replaced by the source's own
+MIGRATE_CREATED = {"contenttypes.contenttype", "auth.permission"}
+
+
+def copy_order(models):
+    """``models`` ordered so that every model comes after the models it has foreign keys to."""
+    models = list(models)
+    ordered, seen = [], set()
+
+    def visit(model):
+        if model in seen:
+            return
+        seen.add(model)
+        for field in model._meta.concrete_fields:
+            parent = field.related_model if field.many_to_one or field.one_to_one else None
+            # Self references (a desk's users) are left to the deferred FK checks
+            if parent is not None and parent is not model and parent in models:
+                visit(parent)
+        ordered.append(model)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+def copied_models():
+    """Every model with its own table, many-to-many tables included."""
+    return copy_order(
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    )
+
+
+def source_batches(model, batch_size):
+    """The source rows of ``model`` in primary key order, ``batch_size`` at a time."""
+    rows = model._base_manager.using(SOURCE_ALIAS).order_by("pk")
+    last = None
+    while True:
+        batch = list((rows if last is None else rows.filter(pk__gt=last))[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1].pk
+
+
+@contextmanager
+def stored_timestamps(models):
+    """Keeps auto_now and auto_now_add fields from overwriting the copied values."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "Copies all data from a SQLite database file into the (migrated) default database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source", nargs="?", default=str(settings.BASE_DIR / "db.sqlite3"),
+            help="SQLite file to copy from (default: db.sqlite3)",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--replace", action="store_true",
+            help="Delete the data already in the target first",
+        )
+
+    def handle(self, *args, source, batch_size=2000, replace=False, **options):
+        if not os.path.exists(source):
+            raise CommandError(f"{source} does not exist.")
+        target = connections[DEFAULT_DB_ALIAS]
+        if target.vendor == "sqlite" and os.path.abspath(target.settings_dict["NAME"]) == os.path.abspath(source):
+            raise CommandError("The source is the default database; point DATABASE_URL at the target.")
+
+        connections.databases[SOURCE_ALIAS] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: target.settings_dict,
+            SOURCE_ALIAS: sqlite_database(source, tuned=False),
+        })[SOURCE_ALIAS]
+        try:
+            self.copy(target, batch_size, replace)
+        finally:
+            connections[SOURCE_ALIAS].close()
+            del connections[SOURCE_ALIAS]
+            del connections.databases[SOURCE_ALIAS]
+
+    def copy(self, target, batch_size, replace):
+        models = copied_models()
+        missing = set(m._meta.db_table for m in models) - set(connections[SOURCE_ALIAS].introspection.table_names())
+        if missing:
+            raise CommandError(f"Run migrate on the source first; it has no {', '.join(sorted(missing))} tables.")
+        if not replace:
+            filled = [
+                model._meta.label for model in models
+                if model._meta.label_lower not in MIGRATE_CREATED
+                and model._base_manager.using(DEFAULT_DB_ALIAS).exists()
+            ]
+            if filled:
+                raise CommandError(
+                    f"The target already has data ({', '.join(filled[:5])}); use --replace to overwrite it."
+                )
+
+        with transaction.atomic(using=DEFAULT_DB_ALIAS), stored_timestamps(models):
+            target.ops.execute_sql_flush(sql_flush(no_style(), target))
+            for model in models:
+                copied = 0
+                for batch in source_batches(model, batch_size):
+                    model._base_manager.using(DEFAULT_DB_ALIAS).bulk_create(batch)
+                    copied += len(batch)
+                if copied:
+                    self.stdout.write(f"{model._meta.label}: {copied} rows")
+            with target.cursor() as cursor:
+                for statement in target.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(statement)
+        self.stdout.write(self.style.SUCCESS(f"Copied {len(models)} tables."))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from plans.seeding import DEFAULT_SIZES, clear_perf_data, seed_perf_data
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generates a reproducible organisation with users, plans in every "
+        "level and workflow status, and matching reports for load testing."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SIZES.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, dest=name)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same data)")
+        parser.add_argument("--year", type=int, default=2025, help="Latest plan year")
+        parser.add_argument("--prefix", default="perf", help="Prefix of seeded usernames and departments")
+        parser.add_argument("--clear", action="store_true", help="Delete an earlier seed with this prefix first")
+
+    def handle(self, *args, seed=42, year=2025, prefix="perf", clear=False, **options):
+        if clear:
+            clear_perf_data(prefix)
+        elif User.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Data with prefix {prefix!r} already exists; use --clear or another --prefix.")
+
+        sizes = {name: options[name] for name in DEFAULT_SIZES}
+        started = time.perf_counter()
+        counts = seed_perf_data(
+            seed=seed, prefix=prefix, year=year,
+            progress=lambda done, total: self.stdout.write(f"  {done}/{total} users"),
+            **sizes,
+        )
+        elapsed = time.perf_counter() - started
+
+        for table, count in counts.items():
+            self.stdout.write(f"{table}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Seeded {sum(counts.values())} rows in {elapsed:.1f}s."))
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, OperationalError, connections, transaction
+
+from accounts.models import User
+from plan_report_tourism.database import sqlite_database
+from plans.models import Plan
+from rollups.signals import suspended as rollup_hooks_suspended
+
+STRESS_ALIAS = "stress"
+
+
+def copy_database(source, path):
+    """
+    Copies the SQLite database ``source`` to ``path`` through SQLite's
+    backup API, which (unlike copying the file) includes the changes still
+    in its -wal file.
+    """
+    with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(path)) as dst:
+        src.backup(dst)
+
+
+def _writer(path, tuned, writes, user_id, results):
+    """One worker process: plan saves and approvals, each in its own transaction."""
+    connections.databases[STRESS_ALIAS] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: connections.databases[DEFAULT_DB_ALIAS],
+        STRESS_ALIAS: sqlite_database(path, tuned=tuned),
+    })[STRESS_ALIAS]
+    plans = Plan.objects.using(STRESS_ALIAS)
+    done = locked = integrity = 0
+    # The roll-up hooks would query the default database, not the copy
+    try:
+        with rollup_hooks_suspended():
+            for i in range(writes):
+                try:
+                    with transaction.atomic(using=STRESS_ALIAS):
+                        # Reads first, as the editor does, then writes
+                        plans.filter(user_id=user_id).count()
+                        plan = plans.create(
+                            user_id=user_id, level="individual", plan_type="yearly", year=2000 + i % 30,
+                        )
+                        plans.filter(pk=plan.pk).update(status="SUBMITTED")
+                    done += 1
+                except OperationalError:
+                    locked += 1
+                except IntegrityError:
+                    integrity += 1
+    finally:
+        connections[STRESS_ALIAS].close()
+        results.put((done, locked, integrity))
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent writer processes against a copy of the SQLite database, "
+        "first with Django's default SQLite settings and then with the tuned ones, "
+        "and reports their throughput and their 'database is locked' and integrity failures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=200, help="Transactions per worker")
+
+    def handle(self, *args, workers=8, writes=200, **options):
+        source = settings.DATABASES["default"]
+        if source["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("The stress test only applies to the SQLite backend.")
+
+        user = User.objects.order_by("pk").first()
+        if user is None:
+            raise CommandError("The database needs at least one user.")
+
+        directory = tempfile.mkdtemp()
+        try:
+            for label, tuned in [("default", False), ("tuned", True)]:
+                path = os.path.join(directory, f"{label}.sqlite3")
+                copy_database(source["NAME"], path)
+                self.run(label, path, tuned, workers, writes, user.pk)
+        finally:
+            shutil.rmtree(directory)
+
+    def run(self, label, path, tuned, workers, writes, user_id):
+        # Forked workers must not share this process's connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [
+            context.Process(target=_writer, args=(path, tuned, writes, user_id, results))
+            for _ in range(workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        done, locked, integrity = (sum(counts) for counts in zip(*totals))
+        self.stdout.write(
+            f"{label}: {done} transactions in {elapsed:.2f}s ({done / elapsed:.0f}/s), "
+            f"{locked} failed with 'database is locked', {integrity} with an integrity error"
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0003_department'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='plan',
+            name='status',
+            field=models.CharField(choices=[('DRAFT', 'Draft'), ('SUBMITTED', 'Submitted'), ('RESUBMITTED', 'Resubmitted'), ('IN_REVIEW', 'In Review'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected')], default='DRAFT', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='plan',
+            index=models.Index(fields=['current_reviewer_role', 'status'], name='plan_reviewer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plan',
+            index=models.Index(fields=['level', 'status'], name='plan_level_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plan',
+            index=models.Index(fields=['-created_at', '-id'], name='plan_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def start_from_created_at(apps, schema_editor):
+    Plan = apps.get_model("plans", "Plan")
+    Plan.objects.update(modified_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0004_alter_plan_status_plan_plan_reviewer_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plan',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(start_from_created_at, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,78 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
-from django.db.models import Sum
-from plans.permissions import PLAN_APPROVAL_FLOW
+from django.contrib.auth import get_user_model
+from django.db.models import Q, Sum
+from django.utils import timezone
+from plans.permissions import PLAN_APPROVAL_FLOW, PILLAR_ROLES, REVIEW_STATUSES
 
 # --- Base Models for Planning Structure ---
 
+class PlanQuerySet(models.QuerySet):
+
+    def visible_to(self, user):
+        """
+        Plans the user is allowed to see, compiled into a single filter:
+        - Own plans (any status)
+        - Plans waiting for the user's approval
+        - Submitted plans in the user's organizational scope
+        """
+        if not user.is_authenticated:
+            return self.none()
+
+        role = (user.role or "").lower()
+
+        visibility = Q(user=user)
+        visibility |= Q(current_reviewer_role=role, status__in=REVIEW_STATUSES)
+
+        scope = Q(pk__in=[])  # matches nothing until a role rule applies
+
+        # Desk → Individual (desk members or same department)
+        if role == "desk":
+            members = Q(user__desk=user)
+            if user.department_id:
+                members |= Q(user__department_id=user.department_id)
+            scope |= Q(level="individual") & members
+
+        # Department → Desk + Individual (same department)
+        if role == "department" and user.department_id:
+            scope |= Q(
+                level__in=["desk", "individual"],
+                user__department_id=user.department_id,
+            )
+
+        # Pillar roles → Departments under that pillar
+        if role in PILLAR_ROLES:
+            # Matched through the owners, so it can search the user_id index
+            members = get_user_model().objects.filter(department__pillar=role).values("pk")
+            scope |= Q(user__in=members)
+
+        # Strategic team → all pillar plans
+        if role == "strategic-team":
+            scope |= Q(level__in=PILLAR_ROLES)
+
+        # Minister → strategic team plans
+        if role == "minister":
+            scope |= Q(level="strategic-team")
+
+        # Drafts stay private to their owner
+        visibility |= scope & ~Q(status="DRAFT")
+        return self.filter(visibility)
+
+    def with_totals(self):
+        """Annotates each plan with the sum of its major activity budgets."""
+        return self.annotate(budget_sum=Sum("major_activities__budget"))
+
+    def touch(self):
+        """Marks the plans modified, for edits to their goals, KPIs and activities."""
+        return self.update(modified_at=timezone.now())
+
+    def awaiting_review_by(self, user):
+        """Plans the user may approve or reject, the query form of Plan.can_user_approve."""
+        if not user.role:
+            return self.none()
+        return self.filter(status__in=REVIEW_STATUSES, current_reviewer_role=user.role)
+
+
 class Plan(models.Model):
     LEVEL_CHOICES = [
             
@@ -85,6 +153,8 @@ class Plan(models.Model):
 
     review_comments = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also moved by edits to the plan's goals, KPIs and activities
+    modified_at = models.DateTimeField(auto_now=True)
 
     # PLAN_APPROVAL_FLOW = {
     #     "individual": "desk",
@@ -98,53 +168,24 @@ class Plan(models.Model):
     #     "strategic-team": "minister",
     # }
 
-    def can_user_view(self, user):
-    #Owner always sees
-        if self.user == user:
-            return True
+    objects = PlanQuerySet.as_manager()
 
-        #Current reviewer
-        if user.role == self.current_reviewer_role:
-            return True
-
-        # Desk → Individual
-        if user.role == "desk" and self.level == "individual":
-            return True
-
-        #Department → Desk + Individual (same department)
-        if (
-            user.role == "department"
-            and self.user.department
-            and user.department == self.user.department
-            and self.level in ["desk", "individual"]
-        ):
-            return True
-
-        # Pillar roles → Departments under that pillar
-        if (
-            user.role in [
-                "corporate",
-                "state-minister-destination",
-                "state-minister-promotion",
-            ]
-            and self.user.department
-            and self.user.department.pillar == user.role
-        ):
-            return True
-
-        #Strategic team → all pillar plans
-        if user.role == "strategic-team" and self.level in [
-            "corporate",
-            "state-minister-destination",
-            "state-minister-promotion",
-        ]:
-            return True
+    class Meta:
+        indexes = [
+            # Reviewer queues: current_reviewer_role + status
+            models.Index(fields=["current_reviewer_role", "status"], name="plan_reviewer_status_idx"),
+            # Organisational scope: level + status (department is joined via user)
+            models.Index(fields=["level", "status"], name="plan_level_status_idx"),
+            # Dashboard ordering and keyset pagination
+            models.Index(fields=["-created_at", "-id"], name="plan_created_id_idx"),
+        ]
 
-        #Minister → strategic team plans
-        if user.role == "minister" and self.level == "strategic-team":
+    def can_user_view(self, user):
+        """Single-plan check against the same rules as Plan.objects.visible_to."""
+        # Owner always sees
+        if self.user_id == user.pk:
             return True
-
-        return False
+        return Plan.objects.visible_to(user).filter(pk=self.pk).exists()
 
 
     def can_user_edit(self, user):
@@ -159,16 +200,16 @@ class Plan(models.Model):
             user.role == self.current_reviewer_role
         )
 
-    def move_to_next_reviewer(self):
-        next_role = PLAN_APPROVAL_FLOW.get(self.level)
+    def approval_state(self, user):
+        """(status, current_reviewer_role) the plan moves to when ``user`` approves it."""
+        if self.is_final_approver(user):
+            return "APPROVED", None
 
+        next_role = PLAN_APPROVAL_FLOW.get(self.level)
         if next_role == "pillar":
             next_role = self.pillar
+        return "IN_REVIEW", next_role
 
-        self.current_reviewer_role = next_role
-        self.status = "IN_REVIEW"
-        self.save()
-    
     # def approve(self, user):
     #     if not self.can_user_approve(user):
     #         raise PermissionError("You cannot approve this plan.")
@@ -204,20 +245,16 @@ class Plan(models.Model):
 
         return user.role == final_role
 
+    @transaction.atomic
     def approve(self, user):
         if not self.can_user_approve(user):
             raise PermissionError("You cannot approve this plan.")
 
-        # FINAL approval
-        if self.is_final_approver(user):
-            self.status = "APPROVED"
-            self.current_reviewer_role = None
-            self.save()
-            return
-
-        # Otherwise → move to next reviewer
-        self.move_to_next_reviewer()
+        # Final approval, or on to the next reviewer
+        self.status, self.current_reviewer_role = self.approval_state(user)
+        self.save()
 
+    @transaction.atomic
     def reject(self, user, comment=None):
         """Reject the plan if the user is the current reviewer."""
         if not self.can_user_approve(user):
@@ -244,7 +281,14 @@ class Plan(models.Model):
     @property
     def total_budget(self):
         """Calculates the total budget from all associated Major Activities."""
-        # Use aggregate for efficient database calculation
+        # Prefer the with_totals() annotation, then prefetched rows
+        if hasattr(self, "budget_sum"):
+            return self.budget_sum or 0.00
+
+        prefetched = getattr(self, "_prefetched_objects_cache", {}).get("major_activities")
+        if prefetched is not None:
+            return sum(activity.budget for activity in prefetched) or 0.00
+
         result = self.major_activities.aggregate(total_budget=Sum("budget"))
         return result["total_budget"] or 0.00
 # --- Plan Detail Models ---
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from .models import DetailActivity
+from .signals import parent_edited, touches_batched
+
+User = get_user_model()
+
+DETAIL_FIELDS = ["detail_activity", "weight", "responsible_person", "status"]
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def save_detail_activities(major_formset, detail_map):
+    """
+    Saves the posted ``detail_activities-*`` rows under each major activity
+    of a saved ``major_formset`` by diffing them against the stored rows.
+
+    Unchanged rows are left alone, edited rows keep their primary key and
+    rows missing from the POST are deleted. Responsible users are resolved
+    with one ``in_bulk`` call, so the query count does not grow with the
+    number of activities.
+    """
+    majors = {}
+    for major_index, major_form in enumerate(major_formset.forms):
+        if major_form.cleaned_data.get('DELETE') or not major_form.instance.pk:
+            continue
+        majors[str(major_index)] = major_form.instance
+
+    existing = {
+        detail.pk: detail
+        for detail in DetailActivity.objects.filter(major_activity__in=majors.values())
+    }
+
+    user_ids = {
+        _parse_id(fields.get('responsible_person'))
+        for major_index in majors
+        for fields in detail_map.get(major_index, {}).values()
+    }
+    users = User.objects.in_bulk(user_ids - {None})
+
+    to_create, to_update, keep = [], [], set()
+
+    for major_index, major in majors.items():
+        for fields in detail_map.get(major_index, {}).values():
+            if fields.get('DELETE') in ('on', '1', 'true'):
+                continue
+
+            if not fields.get('detail_activity'):
+                continue
+
+            values = {
+                'detail_activity': fields.get('detail_activity'),
+                'weight': Decimal(fields.get('weight') or 0),
+                'responsible_person': users.get(_parse_id(fields.get('responsible_person'))),
+                'status': fields.get('status') or 'PENDING',
+            }
+
+            detail = existing.get(_parse_id(fields.get('id')))
+            if detail is None or detail.major_activity_id != major.pk or detail.pk in keep:
+                to_create.append(DetailActivity(major_activity=major, **values))
+                continue
+
+            keep.add(detail.pk)
+            changed = False
+            for name, value in values.items():
+                if name == 'responsible_person':
+                    if detail.responsible_person_id != (value.pk if value else None):
+                        detail.responsible_person = value
+                        changed = True
+                elif getattr(detail, name) != value:
+                    setattr(detail, name, value)
+                    changed = True
+            if changed:
+                to_update.append(detail)
+
+    stale = set(existing) - keep
+    with touches_batched():
+        if stale:
+            DetailActivity.objects.filter(pk__in=stale).delete()
+        if to_update:
+            DetailActivity.objects.bulk_update(to_update, DETAIL_FIELDS)
+        if to_create:
+            DetailActivity.objects.bulk_create(to_create)
+        if stale or to_update or to_create:
+            # Bulk writes send no signals to move the plan's modified_at
+            for plan_id in {major.plan_id for major in majors.values()}:
+                parent_edited("plan", plan_id)
@@ -0,0 +1,51 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def _value(obj, name):
+    # Model instances, or the dicts of a values() queryset
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
+def encode_cursor(obj, field="created_at"):
+    """Opaque cursor pointing just past ``obj`` in a (-field, -id) ordering."""
+    raw = f"{_value(obj, field).isoformat()}|{_value(obj, 'id')}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (timestamp, pk) for a cursor, or None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, pk = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=25, field="created_at"):
+    """
+    Returns (rows, next_cursor) for one page of ``queryset`` ordered by
+    (-field, -id); a values() queryset must include both. Seeking on the
+    cursor keeps every page an index range scan, however deep the user
+    pages.
+    """
+    queryset = queryset.order_by(f"-{field}", "-id")
+
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        timestamp, pk = position
+        queryset = queryset.filter(
+            Q(**{f"{field}__lt": timestamp}) | Q(**{field: timestamp, "id__lt": pk})
+        )
+
+    # One extra row tells us whether there is a next page
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1], field)
+
+    return rows, next_cursor
@@ -36,3 +36,13 @@ PLAN_APPROVAL_FLOW = {
 
     "strategic-team": "minister",
 }
+
+# Roles that head a pillar (and the plan levels they create)
+PILLAR_ROLES = [
+    "corporate",
+    "state-minister-destination",
+    "state-minister-promotion",
+]
+
+# Workflow states in which a plan is waiting on a reviewer
+REVIEW_STATUSES = ["SUBMITTED", "RESUBMITTED", "IN_REVIEW"]
@@ -0,0 +1,76 @@
+"""
+Batch approval and rejection for reviewers clearing their queue.
+
+The plans a reviewer may act on are read in one query, each plan's next
+state comes from the same rules as Plan.approve and Plan.reject, and
+plans moving to the same state are written with one UPDATE, all in one
+transaction. UPDATEs skip post_save, so ``reviewed`` is sent afterwards
+for the roll-ups and the dashboard cache.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Plan
+
+# Sent with sender=Plan or Report after a batch review, with ``pks`` (the
+# rows that changed) and ``approved`` (those now APPROVED)
+reviewed = Signal()
+
+# Per-row outcomes of a batch review
+APPROVED = "approved"
+FORWARDED = "forwarded"  # approved on to the next reviewer
+REJECTED = "rejected"
+DENIED = "denied"  # missing, or not waiting on this reviewer
+
+OUTCOMES = {"APPROVED": APPROVED, "IN_REVIEW": FORWARDED, "REJECTED": REJECTED}
+
+
+def apply_batch(model, targets):
+    """
+    Writes ``targets`` ({pk: {field: value}}) with one UPDATE per distinct
+    set of values. Returns {pk: outcome}.
+    """
+    groups = defaultdict(list)
+    for pk, values in targets.items():
+        groups[tuple(sorted(values.items()))].append(pk)
+
+    now = timezone.now()
+    results = {}
+    for values, pks in groups.items():
+        values = dict(values)
+        model.objects.filter(pk__in=pks).update(**values, modified_at=now)
+        results.update(dict.fromkeys(pks, OUTCOMES[values["status"]]))
+
+    if results:
+        reviewed.send(
+            sender=model,
+            pks=list(results),
+            approved=[pk for pk, outcome in results.items() if outcome == APPROVED],
+        )
+    return results
+
+
+def review_plans(user, plan_ids, approve=True, comment=None):
+    """
+    Approves, or rejects with ``comment``, the plans in ``plan_ids`` that
+    wait on ``user``. Returns {plan id: outcome} covering every id.
+    """
+    results = dict.fromkeys(plan_ids, DENIED)
+    with transaction.atomic():
+        queryset = Plan.objects.awaiting_review_by(user).filter(pk__in=plan_ids)
+        plans = queryset.select_for_update().only("level", "pillar")
+        if approve:
+            targets = {
+                plan.pk: dict(zip(("status", "current_reviewer_role"), plan.approval_state(user)))
+                for plan in plans
+            }
+        else:
+            rejected = {"status": "REJECTED", "current_reviewer_role": None}
+            if comment:
+                rejected["review_comments"] = comment
+            targets = {plan.pk: rejected for plan in plans}
+        results.update(apply_batch(Plan, targets))
+    return results
@@ -0,0 +1,228 @@
+"""
+Reproducible synthetic data for load and scaling tests.
+
+Everything is written with bulk_create, a batch of users (with all of
+their plans, activities and reports) per transaction, so memory stays
+flat and millions of rows take minutes. Seeded users and departments
+share a name prefix, which is how clear_perf_data() finds them again.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from accounts.signals import suspended as user_hooks_suspended
+from accounts.utils import bump_user_table_version
+from reports.models import KPIReport, MajorActivityReport, Report
+from rollups.builder import rebuild_rollups
+from rollups.signals import suspended as rollup_hooks_suspended
+from .models import KPI, Department, DetailActivity, MajorActivity, Plan, StrategicGoal
+from .permissions import PILLAR_ROLES, PLAN_APPROVAL_FLOW, REVIEW_STATUSES
+from .signals import suspended as plan_hooks_suspended
+
+User = get_user_model()
+
+DEFAULT_SIZES = {
+    "departments": 12,
+    "users_per_department": 25,
+    "desk_size": 8,
+    "plans_per_user": 2,
+    "goals_per_plan": 2,
+    "kpis_per_plan": 3,
+    "activities_per_plan": 5,
+    "details_per_activity": 2,
+}
+
+SEED_PASSWORD = "perf-password"
+USERS_PER_BATCH = 200
+BATCH_SIZE = 1000
+
+PLAN_STATUSES = [status for status, _ in Plan.WORKFLOW_STATUS]
+REPORT_STATUSES = [status for status, _ in Report.STATUS_CHOICES]
+PLAN_TYPES = [plan_type for plan_type, _ in Plan.PLAN_TYPE_CHOICES]
+
+
+def split_weight(total, parts):
+    """``parts`` two-place weights adding up to exactly ``total``."""
+    share = (total / parts).quantize(Decimal("0.01"))
+    return [share] * (parts - 1) + [total - share * (parts - 1)]
+
+
+def clear_perf_data(prefix="perf"):
+    """
+    Deletes the users (and so their plans and reports) and departments of
+    an earlier seed. Rows go bottom up, a batch of users at a time, with
+    the per-row hooks off; the roll-ups are rebuilt and the cached
+    dashboards dropped once at the end.
+    """
+    users = User.objects.filter(username__startswith=f"{prefix}-").order_by("pk").values_list("pk", flat=True)
+    with transaction.atomic(), rollup_hooks_suspended(), plan_hooks_suspended(), user_hooks_suspended():
+        while batch := list(users[:USERS_PER_BATCH]):
+            Report.objects.filter(user__in=batch).delete()
+            Plan.objects.filter(user__in=batch).delete()
+            User.objects.filter(pk__in=batch).delete()
+        Department.objects.filter(name__startswith=f"{prefix} ").delete()
+        rebuild_rollups()
+    # Every cached dashboard is keyed on the user table version
+    bump_user_table_version()
+
+
+def seed_org(rng, prefix, sizes):
+    """Departments across the pillars, their staff, and the pillar and ministry heads."""
+    password = make_password(SEED_PASSWORD)
+    departments = Department.objects.bulk_create([
+        Department(name=f"{prefix} Department {i}", pillar=PILLAR_ROLES[i % len(PILLAR_ROLES)])
+        for i in range(sizes["departments"])
+    ])
+
+    def user(username, role, department=None, desk=None):
+        return User(username=f"{prefix}-{username}", password=password, role=role,
+                    department=department, desk=desk)
+
+    heads = [user(role, role) for role in PILLAR_ROLES + ["strategic-team", "minister"]]
+    staff = []
+    for index, department in enumerate(departments):
+        members = sizes["users_per_department"]
+        desks = [
+            user(f"d{index}-desk{i}", "desk", department)
+            for i in range(max(1, (members - 1) // (sizes["desk_size"] + 1)))
+        ]
+        staff.append(user(f"d{index}-head", "department", department))
+        staff.extend(desks)
+        staff.extend(
+            user(f"d{index}-u{i}", "individual", department, rng.choice(desks))
+            for i in range(max(0, members - 1 - len(desks)))
+        )
+    # Desks are referenced by the individuals, so they get their keys first
+    User.objects.bulk_create(heads + [u for u in staff if u.role != "individual"], batch_size=BATCH_SIZE)
+    User.objects.bulk_create([u for u in staff if u.role == "individual"], batch_size=BATCH_SIZE)
+    return heads + staff
+
+
+def plan_pillar(user):
+    if user.department:
+        return user.department.pillar
+    return user.role if user.role in PILLAR_ROLES else None
+
+
+def plan_workflow(rng, user):
+    """(status, current reviewer) for a plan at the user's level."""
+    next_role = PLAN_APPROVAL_FLOW.get(user.role)
+    if next_role is None:
+        return rng.choice(["DRAFT", "APPROVED"]), None
+    status = rng.choice(PLAN_STATUSES)
+    if status not in REVIEW_STATUSES:
+        return status, None
+    if next_role == "pillar":
+        next_role = user.department.pillar
+    return status, next_role
+
+
+def seed_plans(rng, users, sizes, year):
+    """Plans with goals, KPIs, activities and, for approved plans, a report."""
+    plans = []
+    for user in users:
+        for _ in range(sizes["plans_per_user"]):
+            plan_type = rng.choice(PLAN_TYPES)
+            status, reviewer = plan_workflow(rng, user)
+            plans.append(Plan(
+                user=user,
+                level=user.role,
+                plan_type=plan_type,
+                year=year - rng.randrange(3),
+                week_number=rng.randint(1, 52) if plan_type == "weekly" else None,
+                month=rng.randint(1, 12) if plan_type == "monthly" else None,
+                quarter_number=rng.randint(1, 4) if plan_type == "quarterly" else None,
+                pillar=plan_pillar(user),
+                status=status,
+                current_reviewer_role=reviewer,
+            ))
+    Plan.objects.bulk_create(plans, batch_size=BATCH_SIZE)
+
+    goals, kpis, majors = [], [], []
+    for plan in plans:
+        goals.extend(StrategicGoal(plan=plan, title=f"Goal {i + 1}") for i in range(sizes["goals_per_plan"]))
+        for i in range(sizes["kpis_per_plan"]):
+            target = rng.randrange(4, 400, 4)
+            quarters = [target // 4] * 4 if plan.plan_type == "yearly" else [0] * 4
+            kpis.append(KPI(
+                plan=plan, name=f"KPI {i + 1}", measurement="Count", baseline=0, target=target,
+                target_q1=quarters[0], target_q2=quarters[1], target_q3=quarters[2], target_q4=quarters[3],
+            ))
+        for i, weight in enumerate(split_weight(Decimal("100"), sizes["activities_per_plan"])):
+            majors.append(MajorActivity(
+                plan=plan, major_activity=f"Activity {i + 1}", weight=weight,
+                budget=Decimal(rng.randrange(1000, 100000)), responsible_person=plan.user,
+            ))
+    StrategicGoal.objects.bulk_create(goals, batch_size=BATCH_SIZE)
+    KPI.objects.bulk_create(kpis, batch_size=BATCH_SIZE)
+    MajorActivity.objects.bulk_create(majors, batch_size=BATCH_SIZE)
+
+    details = [
+        DetailActivity(
+            major_activity=major, detail_activity=f"Step {i + 1} of {major.major_activity}",
+            weight=weight, responsible_person=major.responsible_person,
+            status=rng.choice(["PENDING", "IN_PROGRESS", "COMPLETED"]),
+        )
+        for major in majors
+        for i, weight in enumerate(split_weight(major.weight, sizes["details_per_activity"]))
+    ]
+    DetailActivity.objects.bulk_create(details, batch_size=BATCH_SIZE)
+
+    approved = {plan.pk: plan for plan in plans if plan.status == "APPROVED"}
+    reports = Report.objects.bulk_create([
+        Report(plan=plan, user=plan.user, reporting_period=plan.plan_type, status=rng.choice(REPORT_STATUSES))
+        for plan in approved.values()
+    ], batch_size=BATCH_SIZE)
+    report_for = {report.plan_id: report for report in reports}
+
+    kpi_reports = []
+    for kpi in kpis:
+        if kpi.plan_id in report_for:
+            actual = rng.randrange(0, int(kpi.target) + 1)
+            kpi_reports.append(KPIReport(
+                report=report_for[kpi.plan_id], kpi=kpi, actual_value=actual,
+                achievement_percent=round(actual / kpi.target * 100, 2),
+            ))
+    KPIReport.objects.bulk_create(kpi_reports, batch_size=BATCH_SIZE)
+    activity_reports = MajorActivityReport.objects.bulk_create([
+        MajorActivityReport(
+            report=report_for[major.plan_id], major_activity=major,
+            progress=Decimal(rng.randrange(0, 101)), actual_budget_used=major.budget / 2,
+        )
+        for major in majors if major.plan_id in report_for
+    ], batch_size=BATCH_SIZE)
+
+    return {
+        "plans": len(plans), "goals": len(goals), "kpis": len(kpis), "major_activities": len(majors),
+        "detail_activities": len(details), "reports": len(reports),
+        "kpi_reports": len(kpi_reports), "activity_reports": len(activity_reports),
+    }
+
+
+def seed_perf_data(seed=42, prefix="perf", year=2025, progress=None, **sizes):
+    """
+    Seeds an org tree with plans in every level and workflow status.
+    The same ``seed`` and sizes always produce the same data.
+    Returns the number of rows created per table.
+    """
+    sizes = {**DEFAULT_SIZES, **sizes}
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        users = seed_org(rng, prefix, sizes)
+    counts = {"departments": sizes["departments"], "users": len(users)}
+
+    for start in range(0, len(users), USERS_PER_BATCH):
+        with transaction.atomic():
+            for table, count in seed_plans(rng, users[start:start + USERS_PER_BATCH], sizes, year).items():
+                counts[table] = counts.get(table, 0) + count
+        if progress:
+            progress(min(start + USERS_PER_BATCH, len(users)), len(users))
+
+    # Bulk writes skip the signals that keep these in step
+    bump_user_table_version()
+    rebuild_rollups()
+    return counts
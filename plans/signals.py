@@ -0,0 +1,181 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reports.models import Report
+from .dashboard_cache import invalidate, plan_scopes
+from .models import KPI, DetailActivity, MajorActivity, Plan, StrategicGoal
+from .review import reviewed
+
+User = get_user_model()
+
+# Parents edited inside a touches_batched() block
+_batch = threading.local()
+_state = threading.local()
+
+
+@contextmanager
+def suspended():
+    """
+    Turns the timestamp and dashboard cache hooks of plans and reports
+    off in this thread for bulk maintenance, which must invalidate the
+    cached dashboards itself afterwards.
+    """
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = False
+
+
+def active():
+    return not getattr(_state, "suspended", False)
+
+
+def plan_owner(plan):
+    """The owner's desk, department and pillar, from ``plan.user`` when it is already loaded."""
+    if Plan.user.is_cached(plan):
+        owner = plan.user
+        if owner.department_id is None or User.department.is_cached(owner):
+            return {
+                "desk": owner.desk_id,
+                "department": owner.department_id,
+                "department__pillar": owner.department.pillar if owner.department_id else None,
+            }
+    return User.objects.filter(pk=plan.user_id).values("desk", "department", "department__pillar").first() or {}
+
+
+# The editors save the plan itself along with its activities, which
+# covers the budget totals the dashboard shows
+@receiver(post_save, sender=Plan)
+@receiver(post_delete, sender=Plan)
+def plan_changed(sender, instance, **kwargs):
+    if not active():
+        return
+    # The save moved modified_at; its rows saved later in the batch need not
+    if batching():
+        _batch.saved.add(instance.pk)
+    invalidate(plan_scopes(instance, plan_owner(instance)))
+
+
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def report_changed(sender, instance, **kwargs):
+    if not active():
+        return
+    # A dashboard only links the viewer's own reports
+    invalidate([f"user:{instance.user_id}"])
+
+
+@receiver(reviewed, sender=Plan)
+def plans_reviewed(sender, pks, **kwargs):
+    if not active():
+        return
+    plans = list(Plan.objects.filter(pk__in=pks).only("user", "level", "pillar", "current_reviewer_role"))
+    owners = {
+        owner.pop("pk"): owner
+        for owner in User.objects.filter(pk__in={plan.user_id for plan in plans}).values(
+            "pk", "desk", "department", "department__pillar"
+        )
+    }
+    scopes = set()
+    for plan in plans:
+        scopes |= plan_scopes(plan, owners.get(plan.user_id, {}))
+    invalidate(scopes)
+
+
+@receiver(reviewed, sender=Report)
+def reports_reviewed(sender, pks, **kwargs):
+    if not active():
+        return
+    owners = Report.objects.filter(pk__in=pks).values_list("user", flat=True).distinct()
+    invalidate(f"user:{owner}" for owner in owners)
+
+
+def deleted_by_parent(sender, origin):
+    """True when the row goes as part of deleting its parent, which handles the parent's timestamps."""
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not sender
+
+
+@contextmanager
+def touches_batched():
+    """
+    Collects the plans and reports whose rows change inside the block and
+    touches each of them once on the way out, rather than once per row.
+    The editors wrap their saves in it; a nested block joins the outer
+    one, and an exception drops the batch along with the transaction.
+    """
+    if batching():
+        yield
+        return
+    _batch.keys, _batch.saved = set(), set()
+    try:
+        yield
+        keys, saved = _batch.keys, _batch.saved
+    finally:
+        _batch.keys = _batch.saved = None
+    touch_parents(keys, skip=saved)
+
+
+def batching():
+    return getattr(_batch, "keys", None) is not None
+
+
+def parent_edited(kind, pk):
+    """
+    Records an edit to a row of the "plan", "major_activity" or "report"
+    ``pk``: touched at the end of the current batch, or right away
+    outside one.
+    """
+    if not active():
+        return
+    if batching():
+        _batch.keys.add((kind, pk))
+    else:
+        touch_parents({(kind, pk)})
+
+
+def touch_parents(keys, skip=()):
+    """
+    Moves modified_at on the plans and reports named by ``keys`` and
+    drops the plans' cached dashboard lists, in one query per table.
+    """
+    ids = {kind: {pk for key_kind, pk in keys if key_kind == kind} for kind in ("plan", "major_activity", "report")}
+    if ids["plan"] or ids["major_activity"]:
+        plans = list(
+            Plan.objects
+            .filter(Q(pk__in=ids["plan"]) | Q(major_activities__in=ids["major_activity"]))
+            .exclude(pk__in=skip)
+            .select_related("user__department")
+            .distinct()
+        )
+        if plans:
+            Plan.objects.filter(pk__in=[plan.pk for plan in plans]).touch()
+            invalidate(set().union(*(plan_scopes(plan, plan_owner(plan)) for plan in plans)))
+    if ids["report"]:
+        Report.objects.filter(pk__in=ids["report"]).touch()
+
+
+@receiver(post_save, sender=StrategicGoal)
+@receiver(post_save, sender=KPI)
+@receiver(post_save, sender=MajorActivity)
+@receiver(post_delete, sender=StrategicGoal)
+@receiver(post_delete, sender=KPI)
+@receiver(post_delete, sender=MajorActivity)
+def plan_part_changed(sender, instance, origin=None, **kwargs):
+    if instance.plan_id and not deleted_by_parent(sender, origin):
+        parent_edited("plan", instance.plan_id)
+
+
+@receiver(post_save, sender=DetailActivity)
+@receiver(post_delete, sender=DetailActivity)
+def detail_activity_changed(sender, instance, origin=None, **kwargs):
+    if not deleted_by_parent(sender, origin):
+        parent_edited("major_activity", instance.major_activity_id)
@@ -13,5 +13,6 @@ urlpatterns = [
     path('submit/<int:plan_id>/', views.submit_plan, name='submit_plan'),
     path('approve/<int:plan_id>/', views.approve_plan, name='approve_plan'),
     path('reject/<int:plan_id>/', views.reject_plan, name='reject_plan'),
+    path('review/batch/', views.batch_review_plans, name='batch_review_plans'),
 
 ]
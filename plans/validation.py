@@ -0,0 +1,45 @@
+"""
+Plan validation rules shared by the editor forms and the spreadsheet
+importer, so that bulk imports apply them without building a form per row.
+"""
+from decimal import Decimal
+
+QUARTER_TARGET_FIELDS = ['target_q1', 'target_q2', 'target_q3', 'target_q4']
+
+PERIOD_FIELDS = {
+    'weekly': ('week_number', 'Week number is required for a weekly plan.'),
+    'monthly': ('month', 'Month is required for a monthly plan.'),
+    'quarterly': ('quarter_number', 'Quarter number is required for a quarterly plan.'),
+}
+
+
+def plan_period_errors(plan_type, values):
+    """{field: message} when the period field required by ``plan_type`` is missing."""
+    field, message = PERIOD_FIELDS.get(plan_type, (None, None))
+    if field and not values.get(field):
+        return {field: message}
+    return {}
+
+
+def kpi_target_errors(plan_type, values):
+    """{field: message} for the targets a yearly plan's KPI is missing."""
+    if plan_type != 'yearly':
+        return {}
+    errors = {
+        field: "Required for a Yearly Plan."
+        for field in QUARTER_TARGET_FIELDS if values.get(field) is None
+    }
+    if errors and values.get('target') is None:
+        errors['target'] = "Total target is required for a Yearly Plan."
+    return errors
+
+
+def detail_weight_error(detail_weights, major_weight):
+    """Message when the detail weights do not add up to the major activity's weight."""
+    total_weight = sum((weight for weight in detail_weights if weight), Decimal("0.00"))
+    if total_weight != major_weight:
+        return (
+            f"Total detail activity weight ({total_weight}) "
+            f"must equal major activity weight ({major_weight})."
+        )
+    return None
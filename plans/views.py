@@ -1,14 +1,19 @@
+import hashlib
 import re
+from collections import Counter
 from django.contrib import messages
 from django.shortcuts import redirect
-from django.template.loader import render_to_string
+from django.core.cache import cache
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
-from django.db.models import Q
-from django.http import Http404
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_POST
 from django.forms import inlineformset_factory
 from django.db import transaction
 from reports.models import Report
@@ -16,6 +21,7 @@ from reports.models import Report
 from reports.models import Report # Important for atomic nested saves
 from .models import Department, Plan, StrategicGoal, KPI, MajorActivity, DetailActivity
 from plans.permissions import PLAN_APPROVAL_FLOW
+from .review import review_plans
 from .forms import (
     PlanCreationForm, 
     StrategicGoalFormset, 
@@ -27,12 +33,33 @@ from .forms import (
     KPIForm,
     MajorActivityForm,
     DetailActivityForm,
-    BaseDetailActivityFormSet
-   
+    BaseDetailActivityFormSet,
+    DashboardFilterForm,
+    BatchReviewForm,
+    StrategicGoalFormsetEdit,
+    KPIFormsetEdit,
+    MajorActivityFormsetEdit,
+    DetailActivityFormsetEdit,
+    responsible_person_choices,
 )
+from accounts.utils import user_data_timeout, user_table_version
+from plan_report_tourism.replicas import replica_reads
+from .conditional import conditional_page, viewer_etag
+from .dashboard_cache import (
+    CSRF_PLACEHOLDER,
+    DASHBOARD_CACHE_TIMEOUT,
+    dashboard_cache_key,
+    enabled as dashboard_cache_enabled,
+    with_csrf_token,
+)
+from .nested_save import save_detail_activities
+from .pagination import keyset_page
+from .signals import touches_batched
 
 User = get_user_model()
 
+DASHBOARD_PAGE_SIZE = 25
+
 
 def user_login(request):
     """
@@ -55,6 +82,28 @@ def user_logout(request):
     return redirect('login')
 
 
+def attach_user_reports(plans, user):
+    """
+    Attaches the user's own report and the edit/approve flags the
+    dashboard needs to a page of plans, in a fixed number of queries.
+    """
+    plans = list(plans)
+    prefetch_related_objects(plans, Prefetch(
+        "reports",
+        queryset=Report.objects.filter(user=user).order_by("id"),
+        to_attr="user_reports",
+    ))
+
+    # Permission flags only read columns already on the row
+    for plan in plans:
+        plan.can_edit = plan.can_user_edit(user)
+        plan.can_approve = plan.can_user_approve(user)
+        plan.user_report = plan.user_reports[0] if plan.user_reports else None
+
+    return plans
+
+
+@replica_reads
 @login_required
 def dashboard(request):
     """
@@ -67,15 +116,11 @@ def dashboard(request):
     user = request.user
     user_role = user.role.lower()
 
+    # The table only shows summary columns, so no nested prefetches
     base_queryset = (
         Plan.objects
         .select_related("user")
-        .prefetch_related(
-            "goals",
-            "kpis",
-            "major_activities__detail_activities",
-        )
-        .order_by("-created_at")
+        .with_totals()
     )
     show_department_dropdown = user_role in ["corporate", "state-minister-destination", "state-minister-promotion"]
 
@@ -86,80 +131,52 @@ def dashboard(request):
     # if selected_department:
     #     plans = plans.filter(user__department_id=selected_department)
 
-    visibility = Q(user=user)  # 1️⃣ Own plans always visible
-
-    # 2️⃣ Plans waiting for user's approval
-    visibility |= Q(current_reviewer_role=user_role,
-                    status__in=["SUBMITTED","IN_REVIEW","RESUBMITTED"]
-                    )
-
-    # Desk → Individual in same department
-    if user_role == "desk" and user.department:
-        visibility |= Q(level="individual", user__department=user.department,
-                        status__in=["SUBMITTED","IN_REVIEW","RESUBMITTED"]
-                        )
-
-    # Department → Desk + Individual in same department
-    if user_role == "department" and user.department:
-        visibility |= Q(level__in=["desk","individual"], user__department=user.department,
-                        status__in=["SUBMITTED","IN_REVIEW","RESUBMITTED"]
-                        )
-
-    # 4️⃣ Pillar heads see all plans in their pillar
-    # if user_role in [
-    #     "corporate",
-    #     "state-minister-destination",
-    #     "state-minister-promotion",
-    # ] and user.department:
-    #     visibility |= Q(pillar=user.department.pillar)
-    
-    if user_role in [
-    "corporate",
-    "state-minister-destination",
-    "state-minister-promotion",
-]:
-        visibility |= Q(
-            level="department",
-            user__department__pillar=user_role,
-            status__in=["SUBMITTED","IN_REVIEW","RESUBMITTED"]
-        )
-
-    # 5️⃣ Strategic team sees submitted pillar plans
-    if user_role == "strategic-team":
-            visibility |= Q(level__in=["corporate","state-minister-destination","state-minister-promotion"],
-                            status__in=["SUBMITTED","RESUBMITTED"],
-                            current_reviewer_role="strategic-team")
-    # 6️⃣ Minister sees plans approved by strategic team
-    if user_role == "minister":
-        visibility |= Q(
-            level="strategic-team",
-            status="APPROVED",
-            current_reviewer_role="minister"
-        )
+    plans = base_queryset.visible_to(user)
 
     if selected_department:
-       visibility &= Q(user__department_id=selected_department)
-
-    plans = base_queryset.filter(visibility).distinct()
-    # plans = base_queryset.filter(visibility).distinct()
-
-    reports = Report.objects.filter(
-    plan__in=plans
-)
-    for report in reports:
-        report.can_approve = report.can_user_approve(request.user)
-        report.can_view = report.plan.can_user_view(request.user)
+        plans = plans.filter(user__department_id=selected_department)
 
-    for plan in plans:
-        plan.can_edit = plan.can_user_edit(request.user)
-        plan.can_approve = plan.can_user_approve(request.user)
-        plan.user_report = Report.objects.filter(plan=plan, user=request.user).first()
     # ----------------------------
     # FILTER: My Plans Only feb4
     # ----------------------------
     if show_my_plans:
        plans = plans.filter(user=user)
-       
+
+    filter_form = DashboardFilterForm(request.GET)
+
+    # The plan list is rendered once per generation, see dashboard_cache.py
+    cache_key = dashboard_cache_key(user, request.GET) if dashboard_cache_enabled() else None
+    cached = cache.get(cache_key) if cache_key else None
+    if cached is None:
+        plans = filter_form.filter(plans)
+        page, next_cursor = keyset_page(plans, request.GET.get("cursor"), DASHBOARD_PAGE_SIZE)
+        plans = attach_user_reports(page, user)
+
+        next_page_query = None
+        if next_cursor:
+            query = request.GET.copy()
+            query["cursor"] = next_cursor
+            next_page_query = query.urlencode()
+
+        first_page_query = None
+        if request.GET.get("cursor"):
+            query = request.GET.copy()
+            del query["cursor"]
+            first_page_query = query.urlencode()
+
+        html = render_to_string("plans/partials/dashboard_plans.html", {
+            "plans": plans,
+            "next_page_query": next_page_query,
+            "first_page_query": first_page_query,
+            "csrf_token": CSRF_PLACEHOLDER,
+        }, request=request)
+        cached = {"html": html, "has_plans": bool(plans), "next_page_query": next_page_query}
+        if cache_key:
+            cache.set(cache_key, cached, DASHBOARD_CACHE_TIMEOUT)
+        extra_context = {"plans": plans}
+    else:
+        extra_context = {}
+
     # if show_my_plans:
     #    visibility &= Q(user=user)
     # ----------------------------
@@ -203,12 +220,16 @@ def dashboard(request):
 
 
     return render(request, "plans/dashboard.html", {
-        "plans": plans,
+        "plans_html": mark_safe(with_csrf_token(cached["html"], request)),
+        "has_plans": cached["has_plans"],
+        "next_page_query": cached["next_page_query"],
         "user_role": user_role,
         "show_my_plans": show_my_plans,
         "all_departments": all_departments,
         "selected_department": selected_department,
         "show_department_dropdown": show_department_dropdown,
+        "filter_form": filter_form,
+        **extra_context,
     })
 
 
@@ -288,27 +309,36 @@ def plan_success(request, plan_id):
     return render(request, 'plans/plan_success.html', {'plan_id': plan_id})
     
 
+def plan_page_validators(request, plan_id):
+    # The owner comes along for the page, which shows the owner's controls
+    plan = Plan.objects.visible_to(request.user).select_related("user").filter(pk=plan_id).first()
+    if plan is None:
+        return None
+    return viewer_etag(request, "plan", plan_id, plan.modified_at.isoformat()), plan.modified_at, plan
+
+
+@replica_reads
 @login_required
+@conditional_page(plan_page_validators)
 def view_plan(request, plan_id):
     """
     Displays the details of a specific plan with proper access control.
     """
-    # Eagerly load related objects for efficiency
-    plan = get_object_or_404(
-        Plan.objects.prefetch_related(
-            "goals",
-            "kpis",
+    # Access control ran in the validators' query, which loaded the plan
+    plan = request.page_object
+    if plan is None:
+        raise Http404
+    prefetch_related_objects(
+        [plan],
+        "goals",
+        "kpis",
+        "major_activities",
+        Prefetch(
             "major_activities__detail_activities",
+            queryset=DetailActivity.objects.select_related("responsible_person"),
         ),
-        id=plan_id
     )
 
-    user = request.user
-
-    # Use the centralized can_user_view method
-    if not plan.can_user_view(user):
-        raise Http404("You do not have permission to view this plan.")
-
     context = {
         "plan": plan,
         "goals": plan.goals.all(),
@@ -388,21 +418,51 @@ def parse_detail_activities(post_data):
     return details
 
 
+DETAIL_FORM_TEMPLATE = 'plans/partials/detail_activity_form.html'
+
+
+def empty_detail_form_html():
+    """
+    The blank detail activity row the editor clones in JS. It only changes
+    with the template source or the user list, so it is rendered once per
+    version of those and then served from the cache (only briefly on a
+    process-local cache, see accounts.utils).
+    """
+    template = get_template(DETAIL_FORM_TEMPLATE)
+    source_hash = hashlib.md5(template.template.source.encode(), usedforsecurity=False).hexdigest()
+    cache_key = f"plans:empty-detail-form:{source_hash}:{user_table_version()}"
+
+    html = cache.get(cache_key)
+    if html is None:
+        empty_detail_formset = DetailActivityFormset(
+            prefix='detail_activities-__MAJOR_INDEX__'
+        )
+        html = template.render({
+            'detail_form': empty_detail_formset.empty_form,
+            'major_index': '__MAJOR_INDEX__',
+            'detail_index': '__INDEX__',
+        })
+        cache.set(cache_key, html, user_data_timeout())
+    return html
+
+
 @login_required
 def create_plan(request):
     plan_type = request.POST.get('plan_type') or None
     formset_kwargs = {'plan_type': plan_type} if plan_type else {}
+    # One user list shared by every activity form on the page
+    activity_kwargs = {'responsible_choices': responsible_person_choices()}
 
     if request.method == 'POST':
         form = PlanCreationForm(request.POST, user=request.user)
         
         goal_formset = StrategicGoalFormset(request.POST, prefix='goal')
         kpi_formset = KPIFormset(request.POST, prefix='kpis', form_kwargs=formset_kwargs)
-        major_formset = MajorActivityFormset(request.POST, prefix='major_activities')
+        major_formset = MajorActivityFormset(request.POST, prefix='major_activities', form_kwargs=activity_kwargs)
 
         if form.is_valid() and goal_formset.is_valid() and kpi_formset.is_valid() and major_formset.is_valid():
             try:
-                with transaction.atomic():
+                with transaction.atomic(), touches_batched():
                     plan = form.save(commit=False)
                     # 🔥 CRITICAL FIX
                     if request.user.department:
@@ -425,42 +485,11 @@ def create_plan(request):
                     kpi_formset.save()
 
                     # ===== SAVE MAJOR ACTIVITIES CORRECTLY =====
-                major_formset.instance = plan
-                major_formset.save()
-
-                detail_map = parse_detail_activities(request.POST)
-
-                # Loop through major_formset instead of enumerating DB results
-                for major_index, major_form in enumerate(major_formset.forms):
-                    if major_form.cleaned_data.get('DELETE'):
-                        continue
-                    
-                    major = major_form.instance
-                    
-                    # Clear old details in edit mode
-                    DetailActivity.objects.filter(major_activity=major).delete()
-
-                    # Get detail activities for this major
-                    for fields in detail_map.get(str(major_index), {}).values():
-
-                        if fields.get('DELETE') in ('on', '1', 'true'):
-                            continue
-
-                        if not fields.get('detail_activity'):
-                            continue
-
-                        user_id = fields.get('responsible_person')
-                        responsible_user = User.objects.filter(id=user_id).first() if user_id else None
-
-                        DetailActivity.objects.create(
-                            major_activity=major,
-                            detail_activity=fields.get('detail_activity'),
-                            weight=fields.get('weight') or 0,
-                            responsible_person=responsible_user,
-                            status=fields.get('status', 'PENDING')
-                        )
-
+                    major_formset.instance = plan
+                    major_formset.save()
 
+                    # ===== SAVE DETAIL ACTIVITIES (NESTED) =====
+                    save_detail_activities(major_formset, parse_detail_activities(request.POST))
 
                 return redirect('plan_success', plan_id=plan.id)
             except Exception as e:
@@ -471,20 +500,11 @@ def create_plan(request):
         form = PlanCreationForm(user=request.user)
         goal_formset = StrategicGoalFormset(prefix='goal')
         kpi_formset = KPIFormset(prefix='kpis', form_kwargs=formset_kwargs)
-        major_formset = MajorActivityFormset(prefix='major_activities')
+        major_formset = MajorActivityFormset(prefix='major_activities', form_kwargs=activity_kwargs)
+
     # ===== EMPTY DETAIL ACTIVITY FORM (for JS cloning) =====
-        empty_detail_formset = DetailActivityFormset(
-            prefix='detail_activities-__MAJOR_INDEX__'
-        )
+    detail_form_template_html = empty_detail_form_html()
 
-        detail_form_template_html = render_to_string(
-            'plans/partials/detail_activity_form.html',
-            {
-                'detail_form': empty_detail_formset.empty_form,
-                'major_index': '__MAJOR_INDEX__',
-                'detail_index': '__INDEX__',
-            }
-        )
     return render(request, 'plans/create_plan.html', {
         'form': form,
         'goal_formset': goal_formset,
@@ -500,7 +520,8 @@ def edit_plan(request, plan_id):
     # plan = get_object_or_404(Plan, id=plan_id)
     # if plan.user != request.user:
     #     raise Http404
-    plan = get_object_or_404(Plan, id=plan_id)
+    # The owner comes along for can_user_edit and the dashboard cache scopes
+    plan = get_object_or_404(Plan.objects.select_related("user__department"), id=plan_id)
     # if not plan.can_user_edit(request.user):
     #     raise Http404("Edit not allowed")
     # Redirect if user cannot edit
@@ -511,35 +532,9 @@ def edit_plan(request, plan_id):
     plan_type = request.POST.get('plan_type') or plan.plan_type
     formset_kwargs = {'plan_type': plan_type} if plan_type else {}
 
-    # ---------- FORMSETS ----------
-    StrategicGoalFormsetEdit = inlineformset_factory(
-        Plan, StrategicGoal,
-        form=StrategicGoalForm,
-        extra=0,
-        can_delete=True
-    )
-
-    KPIFormsetEdit = inlineformset_factory(
-        Plan, KPI,
-        form=KPIForm,
-        extra=0,
-        can_delete=True
-    )
-
-    MajorActivityFormsetEdit = inlineformset_factory(
-        Plan, MajorActivity,
-        form=MajorActivityForm,
-        extra=0,
-        can_delete=True
-    )
-
-    DetailActivityFormsetEdit = inlineformset_factory(
-        MajorActivity, DetailActivity,
-        form=DetailActivityForm,
-        formset=BaseDetailActivityFormSet,
-        extra=0,
-        can_delete=True
-    )
+    # One user list shared by every activity form on the page
+    activity_kwargs = {'responsible_choices': responsible_person_choices()}
+    detail_formsets = {}
 
     # ---------- POST ----------
     if request.method == 'POST':
@@ -554,7 +549,8 @@ def edit_plan(request, plan_id):
         major_formset = MajorActivityFormsetEdit(
             request.POST,
             instance=plan,
-            prefix='major_activities'
+            prefix='major_activities',
+            form_kwargs=activity_kwargs
         )
 
       
@@ -566,7 +562,7 @@ def edit_plan(request, plan_id):
             and major_formset.is_valid()
         ):
             try:
-                with transaction.atomic():
+                with transaction.atomic(), touches_batched():
                     # ----- SAVE PLAN -----
                     form.save()
 
@@ -587,39 +583,7 @@ def edit_plan(request, plan_id):
                     major_formset.save()
 
                     # ----- SAVE DETAIL ACTIVITIES (NESTED) -----
-                    detail_map = parse_detail_activities(request.POST)
-
-                    for major_index, major_form in enumerate(major_formset.forms):
-                        if major_form.cleaned_data.get('DELETE'):
-                            continue
-
-                        major = major_form.instance
-
-                        # Clear existing details (edit-safe)
-                        DetailActivity.objects.filter(
-                            major_activity=major
-                        ).delete()
-
-                        for fields in detail_map.get(str(major_index), {}).values():
-                            if fields.get('DELETE') in ('on', '1', 'true'):
-                                continue
-
-                            if not fields.get('detail_activity'):
-                                continue
-
-                            user_id = fields.get('responsible_person')
-                            responsible_user = (
-                                User.objects.filter(id=user_id).first()
-                                if user_id else None
-                            )
-
-                            DetailActivity.objects.create(
-                                major_activity=major,
-                                detail_activity=fields.get('detail_activity'),
-                                weight=fields.get('weight') or 0,
-                                responsible_person=responsible_user,
-                                status=fields.get('status', 'PENDING')
-                            )
+                    save_detail_activities(major_formset, parse_detail_activities(request.POST))
 
                 return redirect('dashboard')
 
@@ -638,29 +602,21 @@ def edit_plan(request, plan_id):
         )
         major_formset = MajorActivityFormsetEdit(
             instance=plan,
-            prefix='major_activities'
+            queryset=MajorActivity.objects.prefetch_related('detail_activities'),
+            prefix='major_activities',
+            form_kwargs=activity_kwargs
         )
 # LOAD DETAIL ACTIVITIES PER MAJOR ACTIVITY
-        detail_formsets = {}
         for idx, major_form in enumerate(major_formset.forms):
             major_instance = major_form.instance
             detail_formsets[str(idx)] = DetailActivityFormsetEdit(
                 instance=major_instance,
-                prefix=f'detail_activities-{idx}'
+                rows=list(major_instance.detail_activities.all()),
+                prefix=f'detail_activities-{idx}',
+                form_kwargs=activity_kwargs
             )
     # ---------- EMPTY DETAIL FORM (JS TEMPLATE) ----------
-    empty_detail_formset = DetailActivityFormsetEdit(
-        prefix='detail_activities-__MAJOR_INDEX__'
-    )
-
-    detail_form_template_html = render_to_string(
-        'plans/partials/detail_activity_form.html',
-        {
-            'detail_form': empty_detail_formset.empty_form,
-            'major_index': '__MAJOR_INDEX__',
-            'detail_index': '__INDEX__',
-        }
-    )
+    detail_form_template_html = empty_detail_form_html()
 
     return render(request, 'plans/edit_plan.html', {
         'form': form,
@@ -772,4 +728,30 @@ def reject_plan(request, plan_id):
         messages.success(request, "Plan rejected successfully.")
     except PermissionError:
         messages.error(request, "You cannot reject this plan.")
-    return redirect('dashboard')
\ No newline at end of file
+    return redirect('dashboard')
+
+
+def batch_review_response(request, review):
+    """
+    Runs ``review`` (review_plans or review_reports) on a posted
+    BatchReviewForm and answers with each row's outcome.
+    """
+    form = BatchReviewForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    results = review(
+        request.user,
+        form.cleaned_data["ids"],
+        approve=form.cleaned_data["action"] == "approve",
+        comment=form.cleaned_data["comment"] or None,
+    )
+    return JsonResponse({
+        "results": [{"id": pk, "outcome": outcome} for pk, outcome in results.items()],
+        "counts": Counter(results.values()),
+    })
+
+
+@login_required
+@require_POST
+def batch_review_plans(request):
+    return batch_review_response(request, review_plans)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reports.models import Report
+
+
+class Command(BaseCommand):
+    help = "Recomputes KPIReport.achievement_percent for every report (or the given ids)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("report_ids", nargs="*", type=int, help="Only these reports")
+
+    def handle(self, *args, report_ids=None, **options):
+        reports = Report.objects.select_related("plan").order_by("pk")
+        if report_ids:
+            reports = reports.filter(pk__in=report_ids)
+
+        rows = 0
+        for report in reports.iterator(chunk_size=500):
+            with transaction.atomic():
+                rows += len(report.recalculate_achievements())
+
+        self.stdout.write(self.style.SUCCESS(f"Recalculated {rows} KPI report rows."))
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicate_reports(apps, schema_editor):
+    """
+    Folds the reports that repeat a (plan, user, reporting_period) into the
+    oldest one. Their KPI and activity rows move over (remove_duplicate_rows
+    then drops any the oldest report already had) and the copies are deleted.
+    """
+    Report = apps.get_model("reports", "Report")
+    duplicates = (
+        Report.objects.order_by().values("plan", "user", "reporting_period")
+        .annotate(keep=models.Min("id"), rows=models.Count("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        copies = list(
+            Report.objects.filter(plan=row["plan"], user=row["user"], reporting_period=row["reporting_period"])
+            .exclude(id=row["keep"]).values_list("id", flat=True)
+        )
+        for model_name in ("KPIReport", "MajorActivityReport"):
+            apps.get_model("reports", model_name).objects.filter(report__in=copies).update(report=row["keep"])
+        Report.objects.filter(id__in=copies).delete()
+
+
+def remove_duplicate_rows(apps, schema_editor):
+    """Keeps the oldest row of any duplicated (report, kpi) / (report, major_activity) pair."""
+    for model_name, field in [("KPIReport", "kpi"), ("MajorActivityReport", "major_activity")]:
+        model = apps.get_model("reports", model_name)
+        duplicates = (
+            model.objects.order_by().values("report", field)
+            .annotate(keep=models.Min("id"), rows=models.Count("id"))
+            .filter(rows__gt=1)
+        )
+        for row in duplicates:
+            model.objects.filter(report=row["report"], **{field: row[field]}).exclude(id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0004_alter_plan_status_plan_plan_reviewer_status_idx_and_more'),
+        ('reports', '0003_alter_majoractivityreport_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('DRAFT', 'Draft'), ('SUBMITTED', 'Submitted'), ('IN_REVIEW', 'In Review'), ('RESUBMITTED', 'Resubmitted'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected')], default='DRAFT', max_length=20),
+        ),
+        migrations.RunPython(merge_duplicate_reports, migrations.RunPython.noop),
+        migrations.RunPython(remove_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='kpireport',
+            constraint=models.UniqueConstraint(fields=('report', 'kpi'), name='unique_kpi_report'),
+        ),
+        migrations.AddConstraint(
+            model_name='majoractivityreport',
+            constraint=models.UniqueConstraint(fields=('report', 'major_activity'), name='unique_activity_report'),
+        ),
+        migrations.AddConstraint(
+            model_name='report',
+            constraint=models.UniqueConstraint(fields=('plan', 'user', 'reporting_period'), name='unique_report_per_period'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-17 00:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0005_plan_modified_at'),
+        ('reports', '0005_report_modified_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-modified_at', '-id'], name='report_modified_id_idx'),
+        ),
+    ]
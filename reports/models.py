@@ -1,11 +1,35 @@
-from .utils import get_kpi_target
-from django.db import models
+from .utils import calculate_achievement, get_kpi_target, get_kpi_target_field
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from plans.models import Plan, KPI, MajorActivity, DetailActivity
-from django.db.models import Avg, Sum
+from plans.permissions import REVIEW_STATUSES
+from django.db.models import Avg, Q, Sum
+from django.utils import timezone
 #report part
 
+class ReportQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Reports the user may open: their own, and submitted reports on
+        plans they can see (drafts stay private to their owner).
+        """
+        if not user.is_authenticated:
+            return self.none()
+        plans = Plan.objects.visible_to(user).values("pk")
+        return self.filter(Q(user=user) | (Q(plan__in=plans) & ~Q(status="DRAFT")))
+
+    def awaiting_review_by(self, user):
+        """Reports the user may approve or reject, the query form of Report.can_user_approve."""
+        if not user.role:
+            return self.none()
+        return self.filter(status__in=REVIEW_STATUSES, plan__current_reviewer_role=user.role)
+
+    def touch(self):
+        """Marks the reports modified, for edits to their KPI and activity rows."""
+        return self.update(modified_at=timezone.now())
+
+
 class Report(models.Model):
     STATUS_CHOICES = [
         ("DRAFT", "Draft"),
@@ -43,11 +67,74 @@ class Report(models.Model):
     )
 
     reviewer_comment = models.TextField(blank=True, null=True)
+    # Also moved by edits to the report's KPI and activity rows
+    modified_at = models.DateTimeField(auto_now=True)
+
+    objects = ReportQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["plan", "user", "reporting_period"],
+                name="unique_report_per_period",
+            ),
+        ]
+        indexes = [
+            # API keyset pagination
+            models.Index(fields=["-modified_at", "-id"], name="report_modified_id_idx"),
+        ]
 
-    
     def __str__(self):
         return f"{self.plan} - {self.reporting_period} Report"
 
+    def scaffold_rows(self):
+        """
+        Creates the KPI and major activity rows this report is still missing:
+        one read and at most one bulk insert per table.
+        """
+        missing_kpis = self.plan.kpis.exclude(kpireport__report=self).values_list("pk", flat=True)
+        kpi_rows = [KPIReport(report=self, kpi_id=pk) for pk in missing_kpis]
+        if kpi_rows:
+            KPIReport.objects.bulk_create(kpi_rows, ignore_conflicts=True)
+
+        missing_activities = (
+            self.plan.major_activities
+            .exclude(majoractivityreport__report=self)
+            .values_list("pk", flat=True)
+        )
+        activity_rows = [MajorActivityReport(report=self, major_activity_id=pk) for pk in missing_activities]
+        if activity_rows:
+            MajorActivityReport.objects.bulk_create(activity_rows, ignore_conflicts=True)
+        if kpi_rows or activity_rows:
+            self.touch()
+
+    def recalculate_achievements(self, kpi_reports=None, fields=()):
+        """
+        Computes achievement_percent for the given KPI rows (default: all of
+        this report's) in one pass, with the plan's target column resolved
+        once, and writes them back together with any extra ``fields`` in a
+        single bulk_update.
+        """
+        if kpi_reports is None:
+            kpi_reports = self.kpi_reports.select_related("kpi")
+        kpi_reports = list(kpi_reports)
+
+        target_field = get_kpi_target_field(self.plan)
+        for kpi_report in kpi_reports:
+            kpi_report.achievement_percent = calculate_achievement(
+                kpi_report.actual_value, getattr(kpi_report.kpi, target_field)
+            )
+
+        if kpi_reports:
+            KPIReport.objects.bulk_update(kpi_reports, ["achievement_percent", *fields])
+            self.touch()
+        return kpi_reports
+
+    def touch(self):
+        """Marks the report modified without saving (or re-validating) the whole row."""
+        self.modified_at = timezone.now()
+        Report.objects.filter(pk=self.pk).update(modified_at=self.modified_at)
+
     @property
     def overall_progress(self):
         result = self.activity_reports.aggregate(avg=Avg("progress"))
@@ -74,10 +161,18 @@ class Report(models.Model):
       
         return self.status in ["SUBMITTED", "RESUBMITTED", "IN_REVIEW"] and user.role == self.plan.current_reviewer_role
     
+    @transaction.atomic
     def approve(self, user):
         if not self.can_user_approve(user):
             raise PermissionDenied("You cannot approve this report.")
 
+        self.status = self.approval_status(user)
+        if self.status == "APPROVED":
+            self.reviewer_comment = None
+        self.save()
+
+    def approval_status(self, user):
+        """The status the report moves to when ``user`` approves it."""
         # FINAL approval
         next_role = self.plan.current_reviewer_role  # Use plan's workflow
         if next_role == "pillar":  # If it uses pillar-level logic
@@ -85,14 +180,11 @@ class Report(models.Model):
 
         # If this is final approver, mark as APPROVED
         if user.role == next_role:
-            self.status = "APPROVED"
-            self.reviewer_comment = None
-        else:
-            # Optional: move to next reviewer (if you have multiple levels)
-            self.status = "IN_REVIEW"
-
-        self.save()
+            return "APPROVED"
+        # Optional: move to next reviewer (if you have multiple levels)
+        return "IN_REVIEW"
 
+    @transaction.atomic
     def reject(self, user, comment=None):
         if not self.can_user_approve(user):
             raise PermissionDenied("You cannot reject this report.")
@@ -119,21 +211,17 @@ class KPIReport(models.Model):
     achievement_percent = models.FloatField(help_text="Calculated %", default=0)
     remark = models.TextField(blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["report", "kpi"], name="unique_kpi_report"),
+        ]
+
     def save(self, *args, **kwargs):
         if self.actual_value is None:
             self.achievement_percent = 0
-            super().save(*args, **kwargs)
-            return
-
-        plan = self.report.plan
-        target = get_kpi_target(self.kpi, plan)
-
-        if target and target > 0:
-            self.achievement_percent = round(
-                (self.actual_value / float(target)) * 100, 2
-            )
         else:
-            self.achievement_percent = 0
+            target = get_kpi_target(self.kpi, self.report.plan)
+            self.achievement_percent = calculate_achievement(self.actual_value, target)
 
         super().save(*args, **kwargs)
 
@@ -167,6 +255,14 @@ class MajorActivityReport(models.Model):
     challenge = models.TextField(blank=True, null=True)
     mitigation = models.TextField(blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report", "major_activity"],
+                name="unique_activity_report",
+            ),
+        ]
+
     def __str__(self):
         return self.major_activity.major_activity
 
@@ -0,0 +1,27 @@
+from django.db import transaction
+
+from plans.review import DENIED, apply_batch
+from .models import Report
+
+
+def review_reports(user, report_ids, approve=True, comment=None):
+    """
+    Approves, or rejects with ``comment``, the reports in ``report_ids``
+    that wait on ``user``, as plans.review.review_plans does for plans.
+    """
+    results = dict.fromkeys(report_ids, DENIED)
+    with transaction.atomic():
+        queryset = Report.objects.awaiting_review_by(user).filter(pk__in=report_ids)
+        reports = queryset.select_for_update(of=("self",)).select_related("plan").only(
+            "plan", "plan__current_reviewer_role", "plan__pillar"
+        )
+        targets = {}
+        for report in reports:
+            if not approve:
+                targets[report.pk] = {"status": "REJECTED", **({"reviewer_comment": comment} if comment else {})}
+            elif report.approval_status(user) == "APPROVED":
+                targets[report.pk] = {"status": "APPROVED", "reviewer_comment": None}
+            else:
+                targets[report.pk] = {"status": "IN_REVIEW"}
+        results.update(apply_batch(Report, targets))
+    return results
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from plans.signals import deleted_by_parent, parent_edited
+from .models import KPIReport, MajorActivityReport
+
+
+@receiver(post_save, sender=KPIReport)
+@receiver(post_save, sender=MajorActivityReport)
+@receiver(post_delete, sender=KPIReport)
+@receiver(post_delete, sender=MajorActivityReport)
+def report_row_changed(sender, instance, origin=None, **kwargs):
+    if not deleted_by_parent(sender, origin):
+        parent_edited("report", instance.report_id)
@@ -1,3 +1,209 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from plans.models import KPI, MajorActivity, Plan
+from .models import KPIReport, MajorActivityReport, Report
+
+
+class ReportConstraintTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", role="individual")
+        cls.plan = Plan.objects.create(
+            user=cls.user, level="individual", plan_type="yearly", year=2025, status="APPROVED"
+        )
+        cls.kpi = KPI.objects.create(plan=cls.plan, name="Visitors", baseline=0, target=100)
+        cls.activity = MajorActivity.objects.create(plan=cls.plan, major_activity="Campaign")
+        cls.report = Report.objects.create(plan=cls.plan, user=cls.user, reporting_period="yearly")
+
+    def test_one_report_per_period(self):
+        with self.assertRaises(IntegrityError):
+            Report.objects.create(plan=self.plan, user=self.user, reporting_period="yearly")
+
+    def test_one_row_per_kpi_and_activity(self):
+        KPIReport.objects.create(report=self.report, kpi=self.kpi)
+        MajorActivityReport.objects.create(report=self.report, major_activity=self.activity)
+        with self.assertRaises(IntegrityError):
+            KPIReport.objects.create(report=self.report, kpi=self.kpi)
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite-specific")
+    def test_lookups_use_indexes(self):
+        lookups = [
+            Report.objects.filter(plan=self.plan, user=self.user, reporting_period="yearly"),
+            KPIReport.objects.filter(report=self.report, kpi=self.kpi),
+            MajorActivityReport.objects.filter(report=self.report, major_activity=self.activity),
+        ]
+        for queryset in lookups:
+            plan = queryset.explain()
+            # Both key columns are matched by one composite index
+            self.assertRegex(plan, r"SEARCH \w+ USING (COVERING )?INDEX \w+ \(\w+=\? AND \w+=\?")
+
+
+class CreateReportScaffoldTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", role="individual")
+
+    def make_plan(self, size):
+        plan = Plan.objects.create(
+            user=self.user, level="individual", plan_type="yearly", year=2025, status="APPROVED"
+        )
+        KPI.objects.bulk_create([
+            KPI(plan=plan, name=f"KPI {i}", baseline=0, target=100) for i in range(size)
+        ])
+        MajorActivity.objects.bulk_create([
+            MajorActivity(plan=plan, major_activity=f"Activity {i}") for i in range(size)
+        ])
+        return plan
+
+    def open_report(self, plan):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("create_report", args=[plan.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_query_count_independent_of_plan_size(self):
+        self.client.force_login(self.user)
+        small, large = self.make_plan(2), self.make_plan(25)
+        self.assertEqual(self.open_report(small), self.open_report(large))
+
+        report = Report.objects.get(plan=large)
+        self.assertEqual(report.kpi_reports.count(), 25)
+        self.assertEqual(report.activity_reports.count(), 25)
+
+        # Re-opening finds every row already in place
+        self.open_report(large)
+        self.assertEqual(KPIReport.objects.filter(report=report).count(), 25)
+
+
+class AchievementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", role="individual")
+        cls.plan = Plan.objects.create(
+            user=cls.user, level="individual", plan_type="quarterly", quarter_number=2,
+            year=2025, status="APPROVED",
+        )
+        cls.report = Report.objects.create(plan=cls.plan, user=cls.user, reporting_period="quarterly")
+        for i in range(10):
+            kpi = KPI.objects.create(plan=cls.plan, name=f"KPI {i}", baseline=0, target=400, target_q2=50)
+            KPIReport.objects.create(report=cls.report, kpi=kpi)
+
+    def test_single_save_uses_period_target(self):
+        kpi_report = KPIReport.objects.first()
+        kpi_report.actual_value = 25
+        kpi_report.save()
+        self.assertEqual(kpi_report.achievement_percent, 50.0)
+
+    def test_batch_recalculation(self):
+        KPIReport.objects.update(actual_value=40)
+        report = Report.objects.select_related("plan").get(pk=self.report.pk)
+        # Read, bulk update, and the report's modified_at
+        with self.assertNumQueries(3):
+            rows = report.recalculate_achievements()
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(set(KPIReport.objects.values_list("achievement_percent", flat=True)), {80.0})
+
+    def test_submit_writes_rows_in_one_batch(self):
+        self.client.force_login(self.user)
+        data = {"overall_comment": "Done"}
+        for prefix, rows in [("kpi_reports", self.report.kpi_reports.order_by("pk")),
+                             ("activity_reports", self.report.activity_reports.all())]:
+            rows = list(rows)
+            data[f"{prefix}-TOTAL_FORMS"] = len(rows)
+            data[f"{prefix}-INITIAL_FORMS"] = len(rows)
+            for i, row in enumerate(rows):
+                data[f"{prefix}-{i}-id"] = row.pk
+                data[f"{prefix}-{i}-report"] = self.report.pk
+                data[f"{prefix}-{i}-actual_value"] = 10
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("create_report", args=[self.plan.pk]), data)
+        self.assertRedirects(response, reverse("view_report", args=[self.report.pk]), fetch_redirect_response=False)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "reports_kpireport"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(set(KPIReport.objects.values_list("achievement_percent", flat=True)), {20.0})
+
+    def test_recalculate_command(self):
+        KPIReport.objects.update(actual_value=5, achievement_percent=0)
+        call_command("recalculate_achievements", stdout=StringIO())
+        self.assertEqual(set(KPIReport.objects.values_list("achievement_percent", flat=True)), {10.0})
+
+
+class ConditionalReportPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", role="individual")
+        cls.desk = User.objects.create_user("desk", role="desk")
+        cls.plan = Plan.objects.create(
+            user=cls.owner, level="individual", plan_type="yearly", year=2025,
+            status="APPROVED", current_reviewer_role="desk",
+        )
+        cls.kpi = KPI.objects.create(plan=cls.plan, name="Visitors", baseline=0, target=100)
+        cls.report = Report.objects.create(plan=cls.plan, user=cls.owner, reporting_period="yearly")
+        cls.report.scaffold_rows()
+        cls.url = reverse("view_report", args=[cls.report.pk])
+
+    def setUp(self):
+        self.client.force_login(self.owner)
+
+    def test_unchanged_report_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in ctx.captured_queries if "reports_kpireport" in q["sql"]])
+
+    def test_row_edits_move_modified_at(self):
+        etag = self.client.get(self.url)["ETag"]
+        kpi_report = KPIReport.objects.get(report=self.report)
+        kpi_report.actual_value = 50
+        kpi_report.save()
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_draft_stays_private(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_login(self.desk)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 403)
+
+
+class BatchReviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", role="individual")
+        cls.desk = User.objects.create_user("desk", role="desk")
+        cls.plan = Plan.objects.create(
+            user=cls.owner, level="individual", plan_type="yearly", year=2025,
+            status="APPROVED", current_reviewer_role="desk",
+        )
+        cls.submitted = Report.objects.create(
+            plan=cls.plan, user=cls.owner, reporting_period="yearly", status="SUBMITTED",
+            reviewer_comment="Resubmit with photos",
+        )
+        cls.draft = Report.objects.create(plan=cls.plan, user=cls.owner, reporting_period="quarterly")
+
+    def test_approves_only_reports_waiting_on_the_reviewer(self):
+        self.client.force_login(self.desk)
+        response = self.client.post(
+            reverse("batch_review_reports"), {"ids": [self.submitted.pk, self.draft.pk], "action": "approve"}
+        )
+        self.assertEqual(response.json()["results"], [
+            {"id": self.submitted.pk, "outcome": "approved"},
+            {"id": self.draft.pk, "outcome": "denied"},
+        ])
+        self.submitted.refresh_from_db()
+        self.assertEqual((self.submitted.status, self.submitted.reviewer_comment), ("APPROVED", None))
+        self.assertEqual(Report.objects.get(pk=self.draft.pk).status, "DRAFT")
 
-# Create your tests here.
+    def test_owner_cannot_review(self):
+        self.client.force_login(self.owner)
+        response = self.client.post(reverse("batch_review_reports"), {"ids": [self.submitted.pk], "action": "reject"})
+        self.assertEqual(response.json()["counts"], {"denied": 1})
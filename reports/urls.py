@@ -7,4 +7,5 @@ urlpatterns = [
     
     path("approve/<int:report_id>/", views.approve_report, name="approve_report"),
     path("reject/<int:report_id>/", views.reject_report, name="reject_report"),
+    path("review/batch/", views.batch_review_reports, name="batch_review_reports"),
 ]
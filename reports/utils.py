@@ -1,20 +1,34 @@
+
+QUARTER_TARGET_FIELDS = {
+    1: "target_q1",
+    2: "target_q2",
+    3: "target_q3",
+    4: "target_q4",
+}
+
+
+def get_kpi_target_field(plan):
+    """
+    Returns the KPI column holding the target for the plan's period
+    """
+    if plan.plan_type == "quarterly" and plan.quarter_number in QUARTER_TARGET_FIELDS:
+        return QUARTER_TARGET_FIELDS[plan.quarter_number]
+
+    # yearly / monthly / weekly
+    return "target"
+
+
 def get_kpi_target(kpi, plan):
     """
     Returns the correct target based on plan type
     """
-    if plan.plan_type == "yearly":
-        return kpi.target
-
-    if plan.plan_type == "quarterly":
-        # example: use Q1–Q4 based on plan quarter
-        if plan.quarter_number == 1:
-            return kpi.target_q1
-        elif plan.quarter_number == 2:
-            return kpi.target_q2
-        elif plan.quarter_number == 3:
-            return kpi.target_q3
-        elif plan.quarter_number == 4:
-            return kpi.target_q4
-
-    # monthly / weekly
-    return kpi.target
+    return getattr(kpi, get_kpi_target_field(plan))
+
+
+def calculate_achievement(actual_value, target):
+    """
+    Achievement as a percentage of the target, 0 when it cannot be computed
+    """
+    if actual_value is None or not target or target <= 0:
+        return 0
+    return round((actual_value / float(target)) * 100, 2)
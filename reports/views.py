@@ -4,9 +4,15 @@ from django.db import transaction
 from django.core.exceptions import PermissionDenied
 from django.contrib import messages
 from django.shortcuts import redirect
+from django.views.decorators.http import require_POST
 
+from plan_report_tourism.replicas import replica_reads
+from plans.conditional import conditional_page, viewer_etag
 from plans.models import Plan
+from plans.signals import touches_batched
+from plans.views import batch_review_response
 from .models import Report, KPIReport, MajorActivityReport
+from .review import review_reports
 from .forms import (
     ReportForm,
     KPIReportFormSet,
@@ -24,21 +30,24 @@ def create_report(request, plan_id):
     )
 
     # Auto-create KPI and major activity report rows
-    for kpi in plan.kpis.all():
-        KPIReport.objects.get_or_create(report=report, kpi=kpi)
+    report.scaffold_rows()
 
-    for activity in plan.major_activities.all():
-        MajorActivityReport.objects.get_or_create(report=report, major_activity=activity)
+    # Rows render their KPI / activity names, so load them up front
+    kpi_reports = KPIReport.objects.select_related("kpi")
+    activity_reports = MajorActivityReport.objects.select_related("major_activity")
 
     if request.method == "POST":
         form = ReportForm(request.POST, instance=report)
-        kpi_formset = KPIReportFormSet(request.POST, instance=report, plan=plan)
-        activity_formset = MajorActivityReportFormSet(request.POST, instance=report)
+        kpi_formset = KPIReportFormSet(request.POST, instance=report, plan=plan, queryset=kpi_reports)
+        activity_formset = MajorActivityReportFormSet(request.POST, instance=report, queryset=activity_reports)
 
         if form.is_valid() and kpi_formset.is_valid() and activity_formset.is_valid():
-            with transaction.atomic():
+            with transaction.atomic(), touches_batched():
                 form.save()
-                kpi_formset.save()
+                # Changed KPI rows are written back in one batch
+                report.recalculate_achievements(
+                    kpi_formset.save(commit=False), fields=["actual_value", "remark"]
+                )
                 activity_formset.save()
 
                 # Submit the report
@@ -52,8 +61,8 @@ def create_report(request, plan_id):
             return redirect("view_report", report.id)
     else:
         form = ReportForm(instance=report)
-        kpi_formset = KPIReportFormSet(instance=report, plan=plan)
-        activity_formset = MajorActivityReportFormSet(instance=report)
+        kpi_formset = KPIReportFormSet(instance=report, plan=plan, queryset=kpi_reports)
+        activity_formset = MajorActivityReportFormSet(instance=report, queryset=activity_reports)
 
     return render(
         request,
@@ -148,20 +157,24 @@ def create_report(request, plan_id):
 #         },
 #     )
 
-@login_required
-def view_report(request, report_id):
-    report = get_object_or_404(Report, id=report_id)
+def report_page_validators(request, report_id):
+    """The report's and its plan's timestamps, if the user may see the report."""
+    report = Report.objects.visible_to(request.user).select_related("plan").filter(pk=report_id).first()
+    if report is None:
+        return None
+    report_modified, plan_modified = report.modified_at, report.plan.modified_at
+    etag = viewer_etag(request, "report", report_id, report_modified.isoformat(), plan_modified.isoformat())
+    return etag, max(report_modified, plan_modified), report
 
-    # Owner can always view
-    if report.user == request.user:
-        pass
-
-    # Others must have plan visibility
-    elif not report.plan.can_user_view(request.user):
-        raise PermissionDenied
 
-    # Draft reports are private to owner
-    if report.status == "DRAFT" and report.user != request.user:
+@replica_reads
+@login_required
+@conditional_page(report_page_validators)
+def view_report(request, report_id):
+    # Loaded by the validators if the user may see it; drafts stay private to their owner
+    report = request.page_object
+    if report is None:
+        get_object_or_404(Report, id=report_id)
         raise PermissionDenied
 
     return render(
@@ -203,3 +216,9 @@ def reject_report(request, report_id):
     return redirect("dashboard")
 
 
+@login_required
+@require_POST
+def batch_review_reports(request):
+    return batch_review_response(request, review_reports)
+
+
@@ -0,0 +1,25 @@
+from django.contrib import admin
+from .models import PlanRollup
+
+
+@admin.register(PlanRollup)
+class PlanRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "department",
+        "pillar",
+        "year",
+        "plan_type",
+        "plan_count",
+        "total_budget",
+        "total_weight",
+        "average_progress",
+        "updated_at",
+    )
+    list_filter = ("pillar", "year", "plan_type")
+    list_select_related = ("department",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
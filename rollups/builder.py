@@ -0,0 +1,119 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from plans.models import DetailActivity, MajorActivity, Plan
+from reports.models import MajorActivityReport
+from .models import PlanRollup
+
+# Only approved plans (and approved reports on them) are rolled up
+ROLLUP_PLAN_STATUS = "APPROVED"
+ROLLUP_REPORT_STATUS = "APPROVED"
+
+TOTAL_FIELDS = [
+    "plan_count",
+    "activity_count",
+    "total_budget",
+    "total_weight",
+    "detail_weight",
+    "progress_sum",
+    "progress_count",
+]
+
+
+def empty_totals():
+    return {
+        field: (0 if field.endswith("count") else Decimal("0.00"))
+        for field in TOTAL_FIELDS
+    }
+
+
+def bucket_values(prefix=""):
+    """
+    values() expressions for the bucket of the plan reached through
+    ``prefix``. The pillar is the department's, or the plan's own when
+    its author has no department.
+    """
+    return {
+        "bucket_department": F(f"{prefix}user__department"),
+        "bucket_pillar": Coalesce(f"{prefix}user__department__pillar", f"{prefix}pillar", Value("")),
+        "bucket_year": F(f"{prefix}year"),
+        "bucket_plan_type": F(f"{prefix}plan_type"),
+    }
+
+
+def pop_bucket(row):
+    """Removes the bucket_* keys from a values() row and returns them as a tuple."""
+    return (
+        row.pop("bucket_department"),
+        row.pop("bucket_pillar"),
+        row.pop("bucket_year"),
+        row.pop("bucket_plan_type"),
+    )
+
+
+def _grouped(queryset, prefix, **aggregates):
+    """Groups ``queryset`` by the bucket of the plan reached through ``prefix``."""
+    return (
+        queryset
+        .filter(**{f"{prefix}status": ROLLUP_PLAN_STATUS})
+        .values(**bucket_values(prefix))
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def compute_rollups():
+    """
+    Full recomputation with one grouped query per source table.
+    Returns {bucket: totals}.
+    """
+    rollups = {}
+
+    def merge(rows):
+        for row in rows:
+            bucket = pop_bucket(row)
+            totals = rollups.setdefault(bucket, empty_totals())
+            for field, value in row.items():
+                totals[field] += value or 0
+
+    merge(_grouped(Plan.objects.all(), "", plan_count=Count("id")))
+    merge(_grouped(
+        MajorActivity.objects.all(), "plan__",
+        activity_count=Count("id"),
+        total_budget=Sum("budget"),
+        total_weight=Sum("weight"),
+    ))
+    merge(_grouped(
+        DetailActivity.objects.all(), "major_activity__plan__",
+        detail_weight=Sum("weight"),
+    ))
+    merge(_grouped(
+        MajorActivityReport.objects.filter(
+            report__status=ROLLUP_REPORT_STATUS, progress__isnull=False
+        ),
+        "report__plan__",
+        progress_sum=Sum("progress"),
+        progress_count=Count("progress"),
+    ))
+    return rollups
+
+
+@transaction.atomic
+def rebuild_rollups():
+    """Replaces every roll-up row with a fresh full computation."""
+    rollups = compute_rollups()
+    PlanRollup.objects.all().delete()
+    PlanRollup.objects.bulk_create([
+        PlanRollup(
+            department_id=department_id,
+            pillar=pillar,
+            year=year,
+            plan_type=plan_type,
+            **totals,
+        )
+        for (department_id, pillar, year, plan_type), totals in rollups.items()
+    ], batch_size=500)
+    return len(rollups)
@@ -0,0 +1,214 @@
+"""
+Incremental PlanRollup maintenance.
+
+Every stored row contributes a fixed amount to one bucket: an approved
+plan counts once, each of its major activities adds its budget and weight,
+each detail activity its weight, and each activity row of an approved
+report its progress. On save the row's contribution is read before and
+after the write and only the difference is applied; on delete the old
+contribution is subtracted. A plan or report whose approval (or bucket)
+changes moves all of its children's contributions at once.
+
+Bulk queryset operations (bulk_create, bulk_update, update) bypass these
+hooks. The editors only bulk-write rows of plans that are not approved,
+and so do not affect any bucket; batch reviews send plans.review.reviewed
+with the plans and reports they approved. check_rollups reports any
+drift, for example after a user moves to another department.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Model, QuerySet, Sum, Value
+
+from plans.models import DetailActivity, MajorActivity, Plan
+from reports.models import MajorActivityReport, Report
+from .builder import (
+    ROLLUP_PLAN_STATUS,
+    ROLLUP_REPORT_STATUS,
+    TOTAL_FIELDS,
+    bucket_values,
+    compute_rollups,
+    empty_totals,
+    pop_bucket,
+)
+from .models import PlanRollup
+
+# model: (path to the plan, extra filters, contributed totals)
+ROW_CONTRIBUTIONS = {
+    Plan: ("", {}, {"plan_count": Value(1)}),
+    MajorActivity: ("plan__", {}, {
+        "activity_count": Value(1),
+        "total_budget": F("budget"),
+        "total_weight": F("weight"),
+    }),
+    DetailActivity: ("major_activity__plan__", {}, {
+        "detail_weight": F("weight"),
+    }),
+    MajorActivityReport: (
+        "report__plan__",
+        {"report__status": ROLLUP_REPORT_STATUS, "progress__isnull": False},
+        {"progress_sum": F("progress"), "progress_count": Value(1)},
+    ),
+}
+
+
+def known_not_to_count(instance):
+    """
+    True when an already-loaded parent shows the row cannot count, which
+    lets the hooks skip their lookups on the common non-approved path.
+    """
+    if isinstance(instance, MajorActivity) and MajorActivity.plan.is_cached(instance):
+        return instance.plan is not None and instance.plan.status != ROLLUP_PLAN_STATUS
+    if isinstance(instance, MajorActivityReport) and MajorActivityReport.report.is_cached(instance):
+        return instance.report.status != ROLLUP_REPORT_STATUS
+    return False
+
+
+# model: path from its rows to their plan, for deletes started from it
+PLAN_PATHS = {
+    Plan: "",
+    Report: "plan__",
+    **{model: prefix for model, (prefix, _, _) in ROW_CONTRIBUTIONS.items()},
+}
+
+
+def approved_plans(origin):
+    """
+    Ids of the approved plans among those owning the rows that ``origin``
+    (the instance or queryset a delete started from) deletes, or None when
+    its model does not lead to a plan. Everything a delete cascades to
+    belongs to those plans.
+    """
+    if isinstance(origin, QuerySet):
+        rows = origin
+    elif isinstance(origin, Model):
+        rows = type(origin)._base_manager.filter(pk=origin.pk)
+    else:
+        return None
+    path = PLAN_PATHS.get(rows.model)
+    if path is None:
+        return None
+    return set(
+        Plan.objects
+        .filter(status=ROLLUP_PLAN_STATUS, pk__in=rows.values(f"{path}pk"))
+        .values_list("pk", flat=True)
+    )
+
+
+def row_contribution(model, pk):
+    """(bucket, totals) the stored row contributes, or None if it does not count."""
+    prefix, filters, values = ROW_CONTRIBUTIONS[model]
+    row = (
+        model.objects
+        .filter(pk=pk, **{f"{prefix}status": ROLLUP_PLAN_STATUS}, **filters)
+        .values(**bucket_values(prefix), **values)
+        .first()
+    )
+    if row is None:
+        return None
+    return pop_bucket(row), row
+
+
+def plan_totals(plan):
+    """Everything an approved ``plan`` contributes, children included."""
+    totals = empty_totals()
+    totals["plan_count"] = 1
+    totals.update({
+        field: value or 0
+        for field, value in MajorActivity.objects.filter(plan=plan).aggregate(
+            activity_count=Count("id"), total_budget=Sum("budget"), total_weight=Sum("weight"),
+        ).items()
+    })
+    totals["detail_weight"] = DetailActivity.objects.filter(
+        major_activity__plan=plan
+    ).aggregate(total=Sum("weight"))["total"] or 0
+    totals.update(report_totals(MajorActivityReport.objects.filter(
+        report__plan=plan, report__status=ROLLUP_REPORT_STATUS
+    )))
+    return totals
+
+
+def report_totals(activity_reports):
+    progress = activity_reports.filter(progress__isnull=False).aggregate(
+        progress_sum=Sum("progress"), progress_count=Count("progress"),
+    )
+    return {field: value or 0 for field, value in progress.items()}
+
+
+def scaled(totals, factor):
+    return {field: value * factor for field, value in totals.items()}
+
+
+def apply_delta(bucket, totals):
+    """Adds ``totals`` to the bucket's row, creating the row on first use."""
+    delta = {field: value for field, value in totals.items() if value}
+    if not delta:
+        return
+    department_id, pillar, year, plan_type = bucket
+    with transaction.atomic():
+        rollup, _ = PlanRollup.objects.get_or_create(
+            department_id=department_id, pillar=pillar, year=year, plan_type=plan_type
+        )
+        PlanRollup.objects.filter(pk=rollup.pk).update(
+            **{field: F(field) + value for field, value in delta.items()}
+        )
+
+
+def apply_change(before, after):
+    """Moves a contribution from ``before`` to ``after`` ((bucket, totals) or None)."""
+    if before and after and before[0] == after[0]:
+        bucket = before[0]
+        apply_delta(bucket, {
+            field: after[1].get(field, 0) - before[1].get(field, 0) for field in TOTAL_FIELDS
+        })
+        return
+    if before:
+        apply_delta(before[0], scaled(before[1], -1))
+    if after:
+        apply_delta(after[0], after[1])
+
+
+def rollup_differences():
+    """
+    Compares the stored rows with a full recomputation.
+    Returns {bucket: (stored, expected)} for every bucket that differs.
+    """
+    expected = compute_rollups()
+    stored = {}
+    for row in PlanRollup.objects.values("department", "pillar", "year", "plan_type", *TOTAL_FIELDS):
+        bucket = (row.pop("department"), row.pop("pillar"), row.pop("year"), row.pop("plan_type"))
+        stored[bucket] = row
+
+    differences = {}
+    for bucket in set(expected) | set(stored):
+        have = stored.get(bucket, empty_totals())
+        want = expected.get(bucket, empty_totals())
+        if any(have[field] != want[field] for field in TOTAL_FIELDS):
+            differences[bucket] = (have, want)
+    return differences
+
+
+def plan_bucket(plan_pk):
+    """Bucket of the plan if it is approved, else None."""
+    contribution = row_contribution(Plan, plan_pk)
+    return contribution[0] if contribution else None
+
+
+def report_bucket(report_pk):
+    """Bucket of the report's plan if both are approved, else None."""
+    row = (
+        Report.objects
+        .filter(pk=report_pk, status=ROLLUP_REPORT_STATUS, plan__status=ROLLUP_PLAN_STATUS)
+        .values(**bucket_values("plan__"))
+        .first()
+    )
+    return pop_bucket(row) if row else None
+
+
+def move_totals(before_bucket, after_bucket, totals_fn):
+    """Moves a whole plan's or report's totals when its bucket changes."""
+    if before_bucket == after_bucket:
+        return
+    totals = totals_fn()
+    apply_change(
+        (before_bucket, totals) if before_bucket else None,
+        (after_bucket, totals) if after_bucket else None,
+    )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rollups.builder import rebuild_rollups
+from rollups.maintenance import rollup_differences
+
+
+class Command(BaseCommand):
+    help = "Compares the incrementally maintained roll-ups with a full rebuild."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rebuild the roll-ups when they differ")
+
+    def handle(self, *args, fix=False, **options):
+        differences = rollup_differences()
+        if not differences:
+            self.stdout.write(self.style.SUCCESS("Roll-ups are consistent."))
+            return
+
+        for bucket, (stored, expected) in sorted(differences.items(), key=str):
+            changed = {
+                field: (stored[field], expected[field])
+                for field in expected if stored[field] != expected[field]
+            }
+            self.stdout.write(f"{bucket}: {changed}")
+
+        if fix:
+            rebuild_rollups()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt after {len(differences)} differing buckets."))
+            return
+        raise CommandError(f"{len(differences)} roll-up buckets differ from a full rebuild.")
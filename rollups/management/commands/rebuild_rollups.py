@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from rollups.builder import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recomputes every PlanRollup row from plans, activities and approved reports."
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} roll-up rows."))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:04
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('plans', '0004_alter_plan_status_plan_plan_reviewer_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pillar', models.CharField(blank=True, default='', max_length=40)),
+                ('year', models.PositiveIntegerField()),
+                ('plan_type', models.CharField(choices=[('weekly', 'Weekly'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('yearly', 'Yearly')], max_length=20)),
+                ('plan_count', models.PositiveIntegerField(default=0)),
+                ('activity_count', models.PositiveIntegerField(default=0)),
+                ('total_budget', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('total_weight', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('detail_weight', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('progress_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('progress_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='plans.department')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pillar', 'year'], name='rollup_pillar_year_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('department__isnull', False)), fields=('department', 'pillar', 'year', 'plan_type'), name='unique_department_rollup'), models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('pillar', 'year', 'plan_type'), name='unique_unassigned_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import Q
+
+from plans.models import Department, Plan
+
+
+class PlanRollup(models.Model):
+    """
+    Precomputed totals for approved plans, one row per
+    (department, pillar, year, plan_type) bucket.
+
+    Plans by users without a department (strategic team, minister) are
+    bucketed with department = NULL under the plan's own pillar.
+    """
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        related_name="rollups",
+        null=True,
+        blank=True
+    )
+    pillar = models.CharField(max_length=40, blank=True, default="")
+    year = models.PositiveIntegerField()
+    plan_type = models.CharField(max_length=20, choices=Plan.PLAN_TYPE_CHOICES)
+
+    plan_count = models.PositiveIntegerField(default=0)
+    activity_count = models.PositiveIntegerField(default=0)
+    total_budget = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0.00"))
+    total_weight = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    detail_weight = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+
+    # Approved report progress, kept as sum + count so it can be averaged
+    progress_sum = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0.00"))
+    progress_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["department", "pillar", "year", "plan_type"],
+                condition=Q(department__isnull=False),
+                name="unique_department_rollup",
+            ),
+            models.UniqueConstraint(
+                fields=["pillar", "year", "plan_type"],
+                condition=Q(department__isnull=True),
+                name="unique_unassigned_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["pillar", "year"], name="rollup_pillar_year_idx"),
+        ]
+
+    def __str__(self):
+        department = self.department.name if self.department_id else "No department"
+        return f"{department} {self.plan_type} {self.year}"
+
+    @property
+    def average_progress(self):
+        if not self.progress_count:
+            return 0
+        return round(self.progress_sum / self.progress_count, 2)
@@ -0,0 +1,146 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from plans.models import DetailActivity, MajorActivity, Plan
+from plans.review import reviewed
+from reports.models import MajorActivityReport, Report
+from .maintenance import (
+    apply_change,
+    approved_plans,
+    known_not_to_count,
+    move_totals,
+    plan_bucket,
+    plan_totals,
+    report_bucket,
+    report_totals,
+    row_contribution,
+)
+
+ROW_MODELS = (MajorActivity, DetailActivity, MajorActivityReport)
+
+_state = threading.local()
+
+
+@contextmanager
+def suspended():
+    """
+    Turns the hooks off for bulk maintenance in this thread, which must
+    rebuild the roll-ups afterwards.
+    """
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = False
+
+
+def active():
+    return not getattr(_state, "suspended", False)
+
+
+def delete_may_count(origin):
+    """
+    False when the delete started from ``origin`` touches no approved
+    plan. Every row a delete removes shares its origin, so the plans are
+    looked up once per delete rather than once per row. Django sends all
+    of a delete's pre_delete signals before its first post_delete, which
+    forgets the lookup again.
+    """
+    if getattr(_state, "delete_origin", None) is not origin:
+        _state.delete_origin = origin
+        _state.delete_plans = approved_plans(origin)
+    return _state.delete_plans is None or bool(_state.delete_plans)
+
+
+# --- Rows that contribute to one bucket ---
+
+def row_before_save(sender, instance, **kwargs):
+    instance._rollup_skip = not active() or known_not_to_count(instance)
+    if instance._rollup_skip or instance.pk is None:
+        instance._rollup_before = None
+    else:
+        instance._rollup_before = row_contribution(sender, instance.pk)
+
+
+def row_after_save(sender, instance, raw=False, **kwargs):
+    if raw or instance._rollup_skip:
+        return
+    apply_change(instance._rollup_before, row_contribution(sender, instance.pk))
+
+
+def row_before_delete(sender, instance, origin=None, **kwargs):
+    if not active() or known_not_to_count(instance) or not delete_may_count(origin):
+        return
+    apply_change(row_contribution(sender, instance.pk), None)
+
+
+def row_after_delete(sender, **kwargs):
+    _state.delete_origin = None
+
+
+for model in ROW_MODELS:
+    pre_save.connect(row_before_save, sender=model, dispatch_uid=f"rollup_pre_save_{model.__name__}")
+    post_save.connect(row_after_save, sender=model, dispatch_uid=f"rollup_post_save_{model.__name__}")
+    pre_delete.connect(row_before_delete, sender=model, dispatch_uid=f"rollup_pre_delete_{model.__name__}")
+for model in (*ROW_MODELS, Plan):
+    post_delete.connect(row_after_delete, sender=model, dispatch_uid=f"rollup_post_delete_{model.__name__}")
+
+
+# --- Approval transitions move every child row at once ---
+
+@receiver(pre_save, sender=Plan)
+def plan_before_save(sender, instance, **kwargs):
+    instance._rollup_before = plan_bucket(instance.pk) if instance.pk and active() else None
+
+
+@receiver(post_save, sender=Plan)
+def plan_after_save(sender, instance, raw=False, **kwargs):
+    if raw or not active():
+        return
+    move_totals(instance._rollup_before, plan_bucket(instance.pk), lambda: plan_totals(instance))
+
+
+@receiver(pre_delete, sender=Plan)
+def plan_before_delete(sender, instance, origin=None, **kwargs):
+    if not active() or not delete_may_count(origin):
+        return
+    # Children are deleted (and subtracted) by their own hooks
+    apply_change(row_contribution(Plan, instance.pk), None)
+
+
+@receiver(pre_save, sender=Report)
+def report_before_save(sender, instance, **kwargs):
+    instance._rollup_before = report_bucket(instance.pk) if instance.pk and active() else None
+
+
+@receiver(post_save, sender=Report)
+def report_after_save(sender, instance, raw=False, **kwargs):
+    if raw or not active():
+        return
+    move_totals(
+        instance._rollup_before,
+        report_bucket(instance.pk),
+        lambda: report_totals(instance.activity_reports.all()),
+    )
+
+
+# --- Batch reviews write with UPDATE and report what they approved ---
+
+@receiver(reviewed, sender=Plan)
+def plans_reviewed(sender, approved, **kwargs):
+    # Plans under review count nowhere, so only the approved ones move
+    if not active():
+        return
+    for pk in approved:
+        move_totals(None, plan_bucket(pk), lambda: plan_totals(pk))
+
+
+@receiver(reviewed, sender=Report)
+def reports_reviewed(sender, approved, **kwargs):
+    if not active():
+        return
+    for pk in approved:
+        move_totals(None, report_bucket(pk), lambda: report_totals(MajorActivityReport.objects.filter(report=pk)))
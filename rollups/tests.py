@@ -0,0 +1,188 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from plans.models import Department, DetailActivity, MajorActivity, Plan
+from plans.review import review_plans
+from reports.models import MajorActivityReport, Report
+from reports.review import review_reports
+from .builder import compute_rollups
+from .maintenance import rollup_differences
+from .models import PlanRollup
+
+
+class RollupTestData:
+    @classmethod
+    def setUpTestData(cls):
+        cls.tourism = Department.objects.create(name="Tourism Services", pillar="corporate")
+        cls.heritage = Department.objects.create(name="Heritage", pillar="state-minister-destination")
+        cls.staff = User.objects.create_user("staff", role="individual", department=cls.tourism)
+        cls.guide = User.objects.create_user("guide", role="individual", department=cls.heritage)
+        cls.corporate = User.objects.create_user("corporate", role="corporate", department=cls.tourism)
+        cls.minister = User.objects.create_user("minister", role="minister")
+
+        cls.plan = cls.make_plan(cls.staff, budgets=[100, 200], progress=[Decimal("50"), Decimal("70")])
+        cls.make_plan(cls.staff, budgets=[25], progress=[Decimal("10")])
+        cls.make_plan(cls.guide, budgets=[1000], progress=[])
+        # Drafts and unapproved reports are left out of the roll-up
+        cls.make_plan(cls.staff, budgets=[999], progress=[], status="DRAFT")
+
+    @classmethod
+    def make_plan(cls, user, budgets, progress, status="APPROVED"):
+        plan = Plan.objects.create(user=user, level=user.role, plan_type="yearly", year=2025, status=status)
+        report = Report.objects.create(plan=plan, user=user, reporting_period="yearly", status="APPROVED")
+        for i, budget in enumerate(budgets):
+            activity = MajorActivity.objects.create(plan=plan, major_activity="A", budget=budget, weight=10)
+            DetailActivity.objects.create(major_activity=activity, detail_activity="D", weight=4)
+            if i < len(progress):
+                MajorActivityReport.objects.create(report=report, major_activity=activity, progress=progress[i])
+        return plan
+
+
+class RebuildRollupTests(RollupTestData, TestCase):
+    def test_rebuild(self):
+        call_command("rebuild_rollups", stdout=StringIO())
+        tourism = PlanRollup.objects.get(department=self.tourism)
+        self.assertEqual(tourism.pillar, "corporate")
+        self.assertEqual(tourism.plan_count, 2)
+        self.assertEqual(tourism.activity_count, 3)
+        self.assertEqual(tourism.total_budget, Decimal("325.00"))
+        self.assertEqual(tourism.total_weight, Decimal("30.00"))
+        self.assertEqual(tourism.detail_weight, Decimal("12.00"))
+        self.assertEqual(tourism.average_progress, Decimal("43.33"))
+
+        heritage = PlanRollup.objects.get(department=self.heritage)
+        self.assertEqual(heritage.total_budget, Decimal("1000.00"))
+        self.assertEqual(heritage.average_progress, 0)
+
+    def test_rebuild_is_idempotent(self):
+        call_command("rebuild_rollups", stdout=StringIO())
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(PlanRollup.objects.count(), len(compute_rollups()))
+
+
+class RollupDashboardTests(RollupTestData, TestCase):
+    def setUp(self):
+        call_command("rebuild_rollups", stdout=StringIO())
+
+    def test_pillar_head_sees_own_pillar(self):
+        self.client.force_login(self.corporate)
+        response = self.client.get(reverse("rollup_dashboard"))
+        self.assertEqual([r.department for r in response.context["rollups"]], [self.tourism])
+        self.assertEqual(response.context["pillar_totals"][0]["total_budget"], Decimal("325.00"))
+
+    def test_minister_sees_everything(self):
+        self.client.force_login(self.minister)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("rollup_dashboard"), {"year": 2025})
+        self.assertEqual(len(response.context["rollups"]), 2)
+
+    def test_other_roles_are_denied(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("rollup_dashboard"))
+        self.assertEqual(response.status_code, 403)
+
+
+class IncrementalRollupTests(RollupTestData, TestCase):
+    def assertConsistent(self):
+        self.assertEqual(rollup_differences(), {})
+
+    def test_setup_is_maintained_incrementally(self):
+        self.assertConsistent()
+        self.assertEqual(PlanRollup.objects.get(department=self.tourism).total_budget, Decimal("325.00"))
+
+    def test_plan_approval_moves_totals(self):
+        head = User.objects.create_user("head", role="department", department=self.tourism)
+        plan = self.make_plan(self.staff, budgets=[50], progress=[Decimal("20")], status="SUBMITTED")
+        plan.current_reviewer_role = "department"
+        plan.save()
+        self.assertConsistent()
+
+        plan.approve(head)
+        self.assertConsistent()
+        self.assertEqual(PlanRollup.objects.get(department=self.tourism).plan_count, 3)
+
+        plan.status = "DRAFT"
+        plan.save()
+        self.assertConsistent()
+        self.assertEqual(PlanRollup.objects.get(department=self.tourism).plan_count, 2)
+
+    def test_report_approval_moves_progress(self):
+        report = self.plan.reports.get()
+        report.status = "SUBMITTED"
+        report.save()
+        self.assertConsistent()
+        self.assertEqual(PlanRollup.objects.get(department=self.tourism).progress_count, 1)
+
+        report.status = "APPROVED"
+        report.save()
+        self.assertConsistent()
+
+    def test_batch_reviews_move_totals(self):
+        head = User.objects.create_user("head", role="department", department=self.tourism)
+        plan = self.make_plan(self.staff, budgets=[50], progress=[Decimal("20")], status="SUBMITTED")
+        Plan.objects.filter(pk=plan.pk).update(current_reviewer_role="department")
+        review_plans(head, [plan.pk])
+        self.assertConsistent()
+        self.assertEqual(PlanRollup.objects.get(department=self.tourism).plan_count, 3)
+
+        report = self.plan.reports.get()
+        report.status = "SUBMITTED"
+        report.save()
+        Plan.objects.filter(pk=self.plan.pk).update(current_reviewer_role="corporate")
+        review_reports(self.corporate, [report.pk])
+        self.assertConsistent()
+
+    def test_activity_edits_and_deletes(self):
+        activity = self.plan.major_activities.first()
+        activity.budget = 150
+        activity.save()
+        self.assertConsistent()
+
+        DetailActivity.objects.create(major_activity=activity, detail_activity="New", weight=6)
+        self.assertConsistent()
+
+        activity.delete()
+        self.assertConsistent()
+
+        self.plan.delete()
+        self.assertConsistent()
+
+    def test_deletes_across_draft_and_approved_plans(self):
+        DetailActivity.objects.filter(weight__gt=0).delete()
+        self.assertConsistent()
+        MajorActivity.objects.all().delete()
+        self.assertConsistent()
+
+    def test_draft_deletes_are_constant(self):
+        counts = []
+        for size in (1, 6):
+            plan = self.make_plan(self.staff, budgets=[5] * size, progress=[Decimal("1")] * size, status="DRAFT")
+            with CaptureQueriesContext(connection) as ctx:
+                plan.delete()
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+        self.assertConsistent()
+
+    def test_draft_edits_skip_lookups(self):
+        draft = Plan.objects.get(status="DRAFT")
+        activity = draft.major_activities.select_related("plan").first()
+        activity.budget = 1
+        # The save, and the plan's modified_at and dashboard scopes; no roll-up lookups
+        with self.assertNumQueries(3):
+            activity.save()
+
+    def test_check_command(self):
+        call_command("check_rollups", stdout=StringIO())
+        PlanRollup.objects.update(plan_count=0)
+        with self.assertRaises(CommandError):
+            call_command("check_rollups", stdout=StringIO())
+        call_command("check_rollups", "--fix", stdout=StringIO())
+        self.assertConsistent()
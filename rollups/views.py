@@ -0,0 +1,53 @@
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.db.models import Sum
+from django.shortcuts import render
+
+from plans.permissions import PILLAR_ROLES
+from .models import PlanRollup
+
+# Pillar heads see their own pillar, the strategic team and minister see all
+ROLLUP_VIEWER_ROLES = PILLAR_ROLES + ["strategic-team", "minister"]
+
+
+@login_required
+def rollup_dashboard(request):
+    """
+    Budget, weight and progress totals per department and pillar,
+    served from the precomputed PlanRollup rows.
+    """
+    role = request.user.role.lower()
+    if role not in ROLLUP_VIEWER_ROLES:
+        raise PermissionDenied
+
+    rollups = PlanRollup.objects.select_related("department")
+    if role in PILLAR_ROLES:
+        rollups = rollups.filter(pillar=role)
+
+    years = list(rollups.values_list("year", flat=True).distinct().order_by("-year"))
+
+    selected_year = request.GET.get("year")
+    if selected_year and selected_year.isdigit():
+        rollups = rollups.filter(year=int(selected_year))
+
+    pillar_totals = list(
+        rollups.values("pillar", "year")
+        .annotate(
+            plan_count=Sum("plan_count"),
+            total_budget=Sum("total_budget"),
+            total_weight=Sum("total_weight"),
+            progress_sum=Sum("progress_sum"),
+            progress_count=Sum("progress_count"),
+        )
+        .order_by("-year", "pillar")
+    )
+    for totals in pillar_totals:
+        count = totals["progress_count"]
+        totals["average_progress"] = round(totals["progress_sum"] / count, 2) if count else 0
+
+    return render(request, "rollups/dashboard.html", {
+        "rollups": rollups.order_by("-year", "pillar", "department__name", "plan_type"),
+        "pillar_totals": pillar_totals,
+        "years": years,
+        "selected_year": selected_year,
+    })